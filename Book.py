@@ -2,8 +2,9 @@
 
 import os
 from unidecode import unidecode
-from .fetcher import fetch_metadata_by_isbn
-from .fetcher import fetch_metadata_by_title_author
+from .providers import fetch_metadata_by_isbn, OpenLibrary
+from .providers import fetch_metadata_by_title_author
+from .offline_index import lookup_isbn, lookup_title_author
 from .extractor import extract_isbn_from_filename, extract_file_extension
 from .parser import parse_filename
 from .formatter import log
@@ -17,7 +18,9 @@ class Book():
         self,
         path_to_file,
         interactive_organizer=False,
-        output_path_dir=None
+        output_path_dir=None,
+        hedge_delay=None,
+        defer_review=False
             ):
         self.path, self.filename = os.path.split(path_to_file)
         self.fullpath = path_to_file
@@ -29,27 +32,56 @@ class Book():
         self.new_fullpath = ""
         self.output_path_dir = output_path_dir or "organized_books"
         self.interactive_organizer = interactive_organizer
-
-    def organize_book(self):
-        self.find_metadata()
+        self.hedge_delay = hedge_delay
+        # Instead of prompting, keep the candidates of an ambiguous lookup
+        # here for a later review (see review.py)
+        self.defer_review = defer_review
+        self.review_candidates = []
+        self.embedded_metadata = None
+        # Metadata of this book's ISBN, when it was looked up in a batch,
+        # and whether Open Library answered for it there
+        self.isbn_metadata = None
+        self.isbn_answered = False
+        self.organized = False
+        # Replayed from the manifest, which has nothing new to store then
+        self.in_manifest = False
+
+    def organize_book(self, embedded_meta=None):
+        self.find_metadata(embedded_meta)
+        self.categorize()
+
+    # Renames, categorizes and places the book based on its metadata
+    def categorize(self):
         self.set_new_filename(self.metadata)
         self.set_categories()
         self.set_new_path()
+        self.organized = True
 
-    def find_metadata(self):
-        embedded_meta = extract_embedded_metadata(self.fullpath)
+    # embedded_meta can be passed in when it was already extracted elsewhere
+    # (e.g. on a process pool)
+    def find_metadata(self, embedded_meta=None):
+        embedded_meta = self._embedded_with_isbn(embedded_meta)
 
-        if not embedded_meta.get("isbn"):
-            embedded_meta["isbn"] = extract_isbn_from_filename(self.filename)
-
-        if all(embedded_meta.values()):
+        if self._embedded_is_complete(embedded_meta):
             log("[INFO]", "Using embedded metadata.")
             self.metadata = embedded_meta
             return embedded_meta
 
         if embedded_meta.get("isbn"):
+            indexed = lookup_isbn(embedded_meta["isbn"])
+            if indexed:
+                log("[INFO]", "Using metadata of the offline index.")
+                self.metadata = indexed
+                return indexed
+            if self.isbn_metadata:
+                log("[INFO]", "Using metadata of the batched ISBN lookup.")
+                self.metadata = self.isbn_metadata
+                return self.metadata
             log("[INFO]", "Fetching metadata via embedded ISBN.")
-            self.metadata = fetch_metadata_by_isbn(embedded_meta["isbn"])
+            self.metadata = fetch_metadata_by_isbn(
+                embedded_meta["isbn"],
+                skip=[OpenLibrary.name] if self.isbn_answered else []
+                )
             return self.metadata
 
         # Fall back to filename parsing
@@ -59,11 +91,19 @@ class Book():
         title = title.replace("_ ", ": ").replace("_", " ")
 
         if author and title:
+            indexed = lookup_title_author(author, title)
+            if indexed:
+                log("[INFO]", "Using metadata of the offline index.")
+                self.metadata = indexed
+                return indexed
             log("[INFO]", f"Fallback to title/author: '{title}' by '{author}'")
             self.metadata = fetch_metadata_by_title_author(
                 author, title,
                 interactive=self.interactive_organizer,
-                filename=self.filename
+                filename=self.filename,
+                hedge_delay=self.hedge_delay,
+                candidates=self.review_candidates if self.defer_review
+                else None
             )
             return self.metadata
 
@@ -71,6 +111,53 @@ class Book():
         self.metadata = embedded_meta
         return self.metadata
 
+    # Found candidates, but none it could take without asking
+    def needs_review(self):
+        return bool(self.defer_review and not self.metadata
+                    and self.review_candidates)
+
+    # The ISBN find_metadata would fetch the book by, if any, so it can be
+    # resolved ahead of time in a batch (see isbn_metadata)
+    def isbn_to_fetch(self, embedded_meta=None):
+        embedded_meta = self._embedded_with_isbn(embedded_meta)
+        isbn = embedded_meta.get("isbn")
+        if self._embedded_is_complete(embedded_meta) or lookup_isbn(isbn):
+            return None
+        return isbn or None
+
+    def _embedded_with_isbn(self, embedded_meta):
+        if embedded_meta is None:
+            embedded_meta = extract_embedded_metadata(self.fullpath)
+        else:
+            embedded_meta = dict(embedded_meta)
+
+        if not embedded_meta.get("isbn"):
+            embedded_meta["isbn"] = extract_isbn_from_filename(self.filename)
+        return embedded_meta
+
+    # Formats without embedded metadata only carry the filename's ISBN
+    @staticmethod
+    def _embedded_is_complete(embedded_meta):
+        return bool(embedded_meta.get("title") and all(embedded_meta.values()))
+
+    # Everything that was resolved for this book, as stored in the manifest
+    def to_record(self):
+        return {
+            "metadata": self.metadata,
+            "categories": self.categories,
+            "new_filename": self.new_filename,
+            "new_fullpath": self.new_fullpath,
+        }
+
+    # Replays a stored record without any extraction or API call. The path
+    # is rebuilt so it follows the current output directory
+    def restore(self, record):
+        self.metadata = record["metadata"]
+        self.categories = record["categories"]
+        self.new_filename = record["new_filename"]
+        self.set_new_path()
+        self.organized = True
+
     # Renames the book based on the newly aquired metadata
     def set_new_filename(self, metadata):
         if not metadata:
@@ -0,0 +1,141 @@
+# benchmarks/fake_google_books.py
+
+""" Local stand-in for the Google Books and Open Library APIs """
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .synthetic_library import PUBLISHERS
+
+SEARCH_TERM = re.compile(
+    r"(intitle|inauthor|isbn):(.*?)(?=(?:intitle|inauthor|isbn):|$)"
+    )
+
+
+class FakeGoogleBooksHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/api/books":
+            answer = server.respond_bibkeys(params.get("bibkeys", [""])[0])
+        elif url.path == "/search.json":
+            answer = server.respond_search(
+                params.get("title", [""])[0], params.get("author", [""])[0]
+                )
+        else:
+            answer = server.respond(params.get("q", [""])[0])
+        body = json.dumps(answer).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeGoogleBooks():
+    """
+    Serves volumes for any query after latency seconds, except for a
+    miss_rate share of queries which get no items. Use as a context
+    manager; url replaces config.GOOGLE_BOOKS_API, openlib_url
+    config.OPEN_LIBRARY_API and openlib_search_url
+    config.OPEN_LIBRARY_SEARCH_API.
+    """
+    def __init__(self, latency=0.05, miss_rate=0.1, seed=0):
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), FakeGoogleBooksHandler
+            )
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.latency = latency
+        self.server.respond = self.respond
+        self.server.respond_bibkeys = self.respond_bibkeys
+        self.server.respond_search = self.respond_search
+        self.miss_rate = miss_rate
+        self.seed = seed
+        self.url = \
+            f"http://127.0.0.1:{self.server.server_port}/books/v1/volumes?q="
+        self.openlib_url = f"http://127.0.0.1:{self.server.server_port}" \
+            "/api/books?format=json&jscmd=data&bibkeys="
+        self.openlib_search_url = \
+            f"http://127.0.0.1:{self.server.server_port}/search.json?"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def respond(self, query):
+        # Same query, same answer: misses and volumes derive from the query
+        rng = random.Random(f"{self.seed}:{query}")
+        if rng.random() < self.miss_rate:
+            return {"totalItems": 0}
+
+        # "+" between the search terms arrives decoded as a space
+        fields = {
+            key: value.strip() for key, value in SEARCH_TERM.findall(query)
+            }
+        isbn = fields.get("isbn", "")
+        return {"totalItems": 1, "items": [{"volumeInfo": {
+            "title": fields.get("intitle") or f"Book {isbn}",
+            "authors": [fields.get("inauthor") or "Unknown Author"],
+            "publishedDate": str(rng.randint(1950, 2024)),
+            "publisher": rng.choice(PUBLISHERS),
+            "industryIdentifiers": [
+                {"type": "ISBN_13", "identifier": isbn or "9780000000000"}
+                ],
+            "categories": [rng.choice(["Computers", "Science", "Games"])],
+        }}]}
+
+    def respond_bibkeys(self, bibkeys):
+        records = {}
+        for bibkey in filter(None, bibkeys.split(",")):
+            isbn = bibkey.partition(":")[2]
+            rng = random.Random(f"{self.seed}:isbn:{isbn}")
+            if rng.random() < self.miss_rate:
+                continue
+            records[bibkey] = {
+                "title": f"Book {isbn}",
+                "authors": [{"name": "Unknown Author"}],
+                "publish_date": str(rng.randint(1950, 2024)),
+                "publishers": [{"name": rng.choice(PUBLISHERS)}],
+                "identifiers": {"isbn_13": [isbn]},
+                "subjects": [
+                    {"name": rng.choice(["Computers", "Science", "Games"])}
+                    ],
+                }
+        return records
+
+    def respond_search(self, title, author):
+        rng = random.Random(f"{self.seed}:search:{title}:{author}")
+        if rng.random() < self.miss_rate:
+            return {"numFound": 0, "docs": []}
+        return {"numFound": 1, "docs": [{
+            "title": title,
+            "author_name": [author or "Unknown Author"],
+            "first_publish_year": rng.randint(1950, 2024),
+            "publisher": [rng.choice(PUBLISHERS)],
+            "subject": [rng.choice(["Computers", "Science", "Games"])],
+            }]}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True)\
+            .start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
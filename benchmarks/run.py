@@ -0,0 +1,118 @@
+# benchmarks/run.py
+
+"""
+End-to-end benchmark of organize_dir on synthetic libraries served by a
+local fake Google Books API.
+
+    python -m book_org.benchmarks.run --sizes 1000 10000 100000
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import contextlib
+
+from .. import fetcher, profiler
+from ..core import organize_dir
+from .synthetic_library import generate_library
+from .fake_google_books import FakeGoogleBooks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+        )
+    parser.add_argument("--workdir", type=str, default="book_org_bench")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--miss-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=16)
+    parser.add_argument("-p", "--procs", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--output", type=str, default="bench_results.json")
+    return parser.parse_args()
+
+
+# Libraries are kept in workdir and reused by later runs with the same seed
+def get_library(workdir, size, seed):
+    library = os.path.join(workdir, f"library-{size}-{seed}")
+    marker = os.path.join(library, ".complete")
+    if not os.path.exists(marker):
+        shutil.rmtree(library, ignore_errors=True)
+        print(f"Generating {size} books in {library}...")
+        generate_library(library, size, seed=seed)
+        open(marker, "w").close()
+    return library
+
+
+def bench(library, size, args):
+    output = os.path.join(args.workdir, "organized")
+    shutil.rmtree(output, ignore_errors=True)
+
+    with FakeGoogleBooks(args.latency, args.miss_rate, args.seed) as server:
+        fetcher.GOOGLE_BOOKS_API = server.url
+        fetcher.OPEN_LIBRARY_API = server.openlib_url
+        fetcher.OPEN_LIBRARY_SEARCH_API = server.openlib_search_url
+        profiler.enable()
+        start = time.perf_counter()
+
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                devnull = stack.enter_context(open(os.devnull, "w"))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            # Dry run: the library is left untouched for the next run
+            organize_dir(
+                library,
+                dry=True,
+                output_path_dir=output,
+                jobs=args.jobs,
+                procs=args.procs
+                )
+
+        elapsed = time.perf_counter() - start
+        summary = profiler.summary()
+        profiler.disable()
+
+    return {
+        "size": size,
+        "seconds": elapsed,
+        "books_per_second": size / elapsed if elapsed else 0.0,
+        "api_requests": server.requests,
+        "api_calls_per_book": summary["api_calls_per_book"],
+        "stages": summary["stages"],
+    }
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.workdir, exist_ok=True)
+    args.workdir = os.path.abspath(args.workdir)
+    results = []
+
+    for size in args.sizes:
+        library = get_library(args.workdir, size, args.seed)
+        # logfile.txt and the run journal are written to the working dir
+        cwd = os.getcwd()
+        os.chdir(args.workdir)
+        try:
+            result = bench(library, size, args)
+        finally:
+            os.chdir(cwd)
+        results.append(result)
+
+        print(f"{size:>7} books: {result['seconds']:8.2f}s "
+              f"{result['books_per_second']:8.1f} books/s "
+              f"{result['api_calls_per_book']:5.2f} API calls/book")
+        for name, stage in result["stages"].items():
+            print(f"    {name:<24}{stage['total']:>10.2f}s "
+                  f"p50 {stage['p50'] * 1000:7.1f}ms "
+                  f"p95 {stage['p95'] * 1000:7.1f}ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
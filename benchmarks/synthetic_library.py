@@ -0,0 +1,134 @@
+# benchmarks/synthetic_library.py
+
+""" Generator of synthetic ebook libraries for the benchmarks """
+import os
+import random
+
+import fitz
+from ebooklib import epub
+
+FIRST_NAMES = [
+    "Andrew", "Maria", "John", "Li", "Fatima", "Hiroshi", "Elena", "David",
+    "Sofia", "Robert", "Amara", "Pierre", "Olga", "Carlos", "Ingrid", "Raj",
+]
+LAST_NAMES = [
+    "Tanenbaum", "Knuth", "Stallings", "Silman", "Loomis", "Sagan", "Martin",
+    "Kernighan", "Hawking", "Polgar", "Lovecraft", "Pressman", "Bridgman",
+    "Feynman", "Ritchie", "Gamma", "Fowler", "Nakamura", "Okafor", "Ivanova",
+]
+TITLE_WORDS = [
+    "Computer", "Networks", "Python", "Cryptography", "Chess", "Endgame",
+    "Drawing", "Anatomy", "Astronomy", "Galaxy", "Flight", "Aircraft",
+    "Distributed", "Systems", "Security", "Military", "History", "Design",
+    "Physics", "Chemistry", "Survival", "Blockchain", "Software", "Data",
+    "Introduction", "Principles", "Practical", "Modern", "Handbook", "Art",
+]
+PUBLISHERS = [
+    "Pearson", "O'Reilly Media", "Wiley", "Springer", "No Starch Press",
+    "Addison-Wesley", "MIT Press", "Packt Publishing", "Dover",
+]
+EXTENSIONS = [".pdf", ".pdf", ".pdf", ".epub", ".epub", ".djvu", ".mobi"]
+
+
+def isbn13(rng):
+    digits = [9, 7, 8] + [rng.randrange(10) for _ in range(9)]
+    total = sum(d * (3 if n % 2 else 1) for n, d in enumerate(digits))
+    return "".join(map(str, digits + [(10 - total % 10) % 10]))
+
+
+def random_book(rng):
+    return {
+        "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 5))),
+        "author": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "publisher": rng.choice(PUBLISHERS),
+        "year": str(rng.randint(1950, 2024)),
+        "isbn": isbn13(rng),
+    }
+
+
+def libgen_name(book, ext, with_isbn):
+    isbn = f" {book['isbn']}" if with_isbn else ""
+    return (f"{book['author']} - {book['title']} ({book['year']}, "
+            f"{book['publisher']}){isbn} - libgen.li{ext}")
+
+
+def zlib_name(book, ext, with_isbn):
+    isbn = f" [{book['isbn']}]" if with_isbn else ""
+    return (f"{book['title'].replace(' ', '_')}_by_"
+            f"{book['author'].replace(' ', '_')}{isbn}-for(z-lib.org){ext}")
+
+
+def annas_name(book, ext, with_isbn):
+    isbn = f" -- isbn13 {book['isbn']}" if with_isbn else ""
+    return (f"{book['title']} -- {book['author']} -- {book['publisher']}, "
+            f"{book['year']}{isbn} -- Anna’s Archive{ext}")
+
+
+NAME_STYLES = [libgen_name, zlib_name, annas_name]
+
+
+def write_pdf(path, book, embed_isbn, embed_metadata):
+    with fitz.open() as doc:
+        page = doc.new_page()
+        text = f"{book['title']}\n{book['author']}\n{book['publisher']}"
+        if embed_isbn:
+            text += f"\nISBN {book['isbn']}"
+        page.insert_text((72, 72), text)
+        if embed_metadata:
+            doc.set_metadata({
+                "title": book["title"], "author": book["author"]
+                })
+        doc.save(path)
+
+
+def write_epub(path, book, embed_isbn, embed_metadata):
+    document = epub.EpubBook()
+    document.set_identifier(book["isbn"])
+    if embed_metadata:
+        document.set_title(book["title"])
+        document.add_author(book["author"])
+    chapter = epub.EpubHtml(title="Copyright", file_name="copyright.xhtml")
+    isbn = f"<p>ISBN {book['isbn']}</p>" if embed_isbn else ""
+    chapter.content = f"<h1>{book['title']}</h1><p>{book['publisher']}</p>"\
+        f"{isbn}"
+    document.add_item(chapter)
+    document.add_item(epub.EpubNcx())
+    document.add_item(epub.EpubNav())
+    document.spine = ["nav", chapter]
+    epub.write_epub(path, document)
+
+
+def generate_library(directory, size, seed=0, isbn_ratio=0.3,
+                     files_per_dir=500):
+    """
+    Fills directory with size books named in LibGen, z-lib and Anna's
+    Archive styles. PDFs and EPUBs are small valid files, some with an
+    ISBN or title/author embedded; other formats are placeholders.
+    Returns the books written as {path: book}.
+    """
+    rng = random.Random(seed)
+    books = {}
+
+    for n in range(size):
+        subdir = os.path.join(directory, f"batch{n // files_per_dir:04d}")
+        os.makedirs(subdir, exist_ok=True)
+
+        book = random_book(rng)
+        ext = rng.choice(EXTENSIONS)
+        name_style = rng.choice(NAME_STYLES)
+        isbn_in_name = rng.random() < isbn_ratio
+        path = os.path.join(subdir, name_style(book, ext, isbn_in_name))
+
+        embed_isbn = rng.random() < isbn_ratio
+        embed_metadata = rng.random() < 0.5
+        if ext == ".pdf":
+            write_pdf(path, book, embed_isbn, embed_metadata)
+        elif ext == ".epub":
+            write_epub(path, book, embed_isbn, embed_metadata)
+        else:
+            with open(path, "wb") as f:
+                f.write(rng.randbytes(1024))
+
+        books[path] = book
+
+    return books
@@ -0,0 +1,90 @@
+# breaker.py
+
+import time
+import threading
+from collections import deque
+from statistics import median
+from .formatter import log
+from .config import CIRCUIT_WINDOW, CIRCUIT_MIN_CALLS, CIRCUIT_ERROR_RATE
+from .config import CIRCUIT_COOLDOWN
+
+
+class CircuitBreaker():
+    """
+    Tracks the latency and errors of the last `window` requests to a host.
+    Once at least min_calls of them failed at error_rate or more the
+    circuit opens and requests are refused for cooldown seconds. Then a
+    single trial request is let through (half open): if it succeeds the
+    circuit closes again, otherwise it stays open for another cooldown.
+    """
+    def __init__(self, name, window=CIRCUIT_WINDOW,
+                 min_calls=CIRCUIT_MIN_CALLS, error_rate=CIRCUIT_ERROR_RATE,
+                 cooldown=CIRCUIT_COOLDOWN):
+        self.name = name
+        self.min_calls = min_calls
+        self.max_error_rate = error_rate
+        self.cooldown = cooldown
+        self._calls = deque(maxlen=window)  # (seconds, succeeded)
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown \
+                    or self._trial:
+                return "open"
+            return "half-open"
+
+    def allow(self):
+        """True if a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown \
+                    or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def record(self, seconds, succeeded):
+        with self._lock:
+            self._calls.append((seconds, succeeded))
+            if self._opened_at is not None:
+                if not self._trial:
+                    return  # sent before the circuit opened
+                self._trial = False
+                if succeeded:
+                    log("[INFO]", f"{self.name} is back, closing its circuit")
+                    self._opened_at = None
+                    self._calls.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            errors = sum(1 for _, ok in self._calls if not ok)
+            if errors >= self.min_calls \
+                    and errors / len(self._calls) >= self.max_error_rate:
+                log("[WARN]", f"{self.name} is failing, skipping it for "
+                    f"{self.cooldown}s")
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Gives up a request allow() let through without its outcome."""
+        with self._lock:
+            self._trial = False
+
+    def error_rate(self):
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(1 for _, ok in self._calls if not ok) \
+                / len(self._calls)
+
+    def latency(self):
+        """Median seconds of the recent requests, 0 before any."""
+        with self._lock:
+            return median(s for s, _ in self._calls) if self._calls else 0.0
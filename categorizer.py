@@ -1,4 +1,5 @@
 import re
+from .profiler import timed
 
 # TODO Make categoty_fallback stricter
 # and less prone to false positives
@@ -239,6 +240,7 @@ KEYWORD_CATEGORY_MAP = {
 }
 
 
+@timed("category_fallback")
 def category_fallback(path: str) -> str:
     """
     Attempts to determine a category from the file path using keyword matching.
@@ -1,7 +1,16 @@
 # cli.py
 
 from .core import organize_dir
+from .config import MANIFEST_FILE, PROFILE_FILE, HTTP_CACHE_FILE
+from .config import OFFLINE_INDEX_FILE, REVIEW_FILE, PREFETCH_BOOKS
+from . import profiler
+from .fetcher import configure_cache, close_cache, set_offline
+from .offline_index import build_index, open_index, close_index
+from .review import ReviewQueue, review_books
+from .formatter import configure_logging, log
 import argparse
+import os
+import sys
 
 
 def parse_args():
@@ -11,20 +20,111 @@ def parse_args():
     parser.add_argument("-d", "--dryrun", action="store_true")
     parser.add_argument("-r", "--recursive", action="store_true")
     parser.add_argument("-i", "--interactive", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument(
+        "-p", "--procs", type=int, nargs="?", const=os.cpu_count(), default=0
+        )
+    parser.add_argument("-m", "--manifest", nargs="?", const=MANIFEST_FILE)
+    parser.add_argument(
+        "--dedupe", nargs="?", const="reuse", choices=["reuse", "move"]
+        )
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_FILE)
+    parser.add_argument("--log-json", action="store_true")
+    parser.add_argument("--refresh", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--hedge", type=float, nargs="?", const=0)
+    parser.add_argument("--index", nargs="?", const=OFFLINE_INDEX_FILE)
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--defer", nargs="?", const=REVIEW_FILE)
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_BOOKS)
 
     args = parser.parse_args()
 
     return args
 
 
+# book_org index EDITIONS [-a AUTHORS] [-o INDEX]
+def parse_index_args(argv):
+    parser = argparse.ArgumentParser(prog="book_org index")
+    parser.add_argument("editions", type=str)
+    parser.add_argument("-a", "--authors", type=str)
+    parser.add_argument("-o", "--output", type=str,
+                        default=OFFLINE_INDEX_FILE)
+    return parser.parse_args(argv)
+
+
+def index_main(argv):
+    args = parse_index_args(argv)
+    count = build_index(args.output, args.editions, args.authors)
+    log("[INFO]", f"Indexed {count} editions into {args.output}")
+
+
+# book_org review [QUEUE] [-d]
+def parse_review_args(argv):
+    parser = argparse.ArgumentParser(prog="book_org review")
+    parser.add_argument("queue", nargs="?", default=REVIEW_FILE)
+    parser.add_argument("-d", "--dryrun", action="store_true")
+    return parser.parse_args(argv)
+
+
+def review_main(argv):
+    args = parse_review_args(argv)
+    if not os.path.exists(args.queue):
+        log("[WARN]", f"No review queue at {args.queue}")
+        return
+    queue = ReviewQueue(args.queue)
+    try:
+        review_books(queue, dry=args.dryrun)
+    finally:
+        queue.close()
+
+
 def main():
+    if sys.argv[1:2] == ["index"]:
+        index_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["review"]:
+        review_main(sys.argv[2:])
+        return
+
     args = parse_args()
-    organize_dir(
-        args.directory,
-        dry=args.dryrun,
-        interactive=args.interactive,
-        output_path_dir=args.output,
-        )
+    if args.index and not os.path.exists(args.index):
+        log("[ERROR]", f"No offline index at {args.index}, "
+            "build one with `book_org index`")
+        sys.exit(1)
+    if args.profile:
+        profiler.enable()
+    if args.log_json:
+        configure_logging(json_lines=True)
+    if not args.no_cache:
+        configure_cache(HTTP_CACHE_FILE, refresh=args.refresh)
+    if args.index:
+        open_index(args.index)
+    if args.offline:
+        set_offline()
+
+    try:
+        organize_dir(
+            args.directory,
+            dry=args.dryrun,
+            interactive=args.interactive,
+            output_path_dir=args.output,
+            jobs=args.jobs,
+            procs=args.procs,
+            manifest_path=args.manifest,
+            dedupe=args.dedupe,
+            resume=args.resume,
+            hedge_delay=args.hedge,
+            review_path=args.defer,
+            prefetch=args.prefetch,
+            )
+    finally:
+        close_cache()
+        close_index()
+        # Also reported when the run fails or is interrupted
+        if args.profile:
+            profiler.report(args.profile)
 
 
 if __name__ == "__main__":
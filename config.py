@@ -2,7 +2,43 @@
 
 GOOGLE_BOOKS_API = \
     "https://www.googleapis.com/books/v1/volumes?orderBy=relevance&q="
-OPEN_LIBRARY_API = "https://openlibrary.org/search.json?"
+# Open Library books API, followed by comma separated ISBN:<isbn> bibkeys
+OPEN_LIBRARY_API = \
+    "https://openlibrary.org/api/books?format=json&jscmd=data&bibkeys="
+# Open Library search API, followed by its title and author parameters
+OPEN_LIBRARY_SEARCH_API = "https://openlibrary.org/search.json?"
+# Google Books results asked for per search, all ranked against the filename,
+# and the score (0-1, see ranking.py) the best one needs to be accepted
+GOOGLE_BOOKS_MAX_RESULTS = 10
+MATCH_THRESHOLD = 0.7
+
+# HTTP client: connections kept alive per host, threads sending hedged
+# queries, and seconds before a request is given up on
+MAX_CONNECTIONS_PER_HOST = 16
+MAX_LOOKUPS_IN_FLIGHT = 256
+HTTP_TIMEOUT = 30
+
+# Requests per second sent to each API host (hosts not listed are not
+# limited), and retries of failed requests with exponential backoff
+API_RATE_LIMITS = {
+    "www.googleapis.com": 10,
+    "openlibrary.org": 3,
+}
+HTTP_RETRIES = 5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 60
+
+# Circuit breaker of each API host: once CIRCUIT_MIN_CALLS of its last
+# CIRCUIT_WINDOW requests failed, making up CIRCUIT_ERROR_RATE of them or
+# more, the host is skipped for CIRCUIT_COOLDOWN seconds and then tried with
+# a single request. APIs answering slower than PROVIDER_SLOW_LATENCY seconds
+# (median) are asked after the others
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 5
+CIRCUIT_ERROR_RATE = 0.5
+CIRCUIT_COOLDOWN = 60
+PROVIDER_SLOW_LATENCY = 5
 
 valid_file_extensions = [
         ".mobi",
@@ -12,3 +48,51 @@ valid_file_extensions = [
         ".pdf",
         ".azw3"
     ]
+
+# ISBNs resolved per Open Library request, and seconds the isbn stage waits
+# for more books to fill a batch
+ISBN_BATCH_SIZE = 50
+ISBN_BATCH_WAIT = 0.5
+
+# Books looked up ahead of the one being asked about in interactive mode,
+# and where the cover previews they show are cached, up to a size
+PREFETCH_BOOKS = 4
+THUMBNAIL_DIR = "book_org_thumbnails"
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# How many discovered paths may wait to be processed before the directory
+# scan pauses
+DISCOVERY_BUFFER = 10000
+
+# Persistent cache of API responses: seconds a response is reused for,
+# seconds a lookup that found nothing is not retried for, and size of the
+# stored responses past which the least recently used go
+HTTP_CACHE_FILE = "book_org_http_cache.sqlite"
+HTTP_CACHE_TTL = 30 * 24 * 60 * 60
+HTTP_MISS_TTL = 7 * 24 * 60 * 60
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Default location of the offline metadata index (index command, --index)
+OFFLINE_INDEX_FILE = "book_org_index.sqlite"
+
+# Default location of the incremental run manifest (--manifest)
+MANIFEST_FILE = "book_org_manifest.sqlite"
+
+# Progress journal of the current organize run, read back by --resume
+JOURNAL_FILE = "book_org_journal.jsonl"
+
+# Books held aside for `book_org review` by --defer
+REVIEW_FILE = "book_org_review.sqlite"
+
+# Where --profile writes its JSON report when no path is given
+PROFILE_FILE = "book_org_profile.json"
+
+# Logfile, rotated to logfile.txt.1, .2... once it reaches LOG_MAX_BYTES
+LOG_FILE = "logfile.txt"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Seconds between redraws of the progress line on a terminal, and between
+# progress summary lines when the output is not a terminal
+PROGRESS_REFRESH_INTERVAL = 0.1
+PROGRESS_SUMMARY_INTERVAL = 10
@@ -1,10 +1,29 @@
 # core.py
 
 import os
+import queue
+import threading
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from .Book import Book
-from .formatter import progress_bar
+from .formatter import ProgressDisplay, log, can_display_images
+from .formatter import quiet_output, replay_log
 from .file_sorter import move_book
-from .config import valid_file_extensions
+from .config import valid_file_extensions, DISCOVERY_BUFFER, JOURNAL_FILE
+from .config import ISBN_BATCH_SIZE, ISBN_BATCH_WAIT, PREFETCH_BOOKS
+from .embedded_metadata import extract_metadata_safe
+from .embedded_metadata import extract_metadata_logged
+from .manifest import Manifest, file_identity
+from .journal import Journal
+from .review import ReviewQueue
+from .dedupe import find_duplicates
+from .extractor import extract_file_extension
+from .pipeline import Pipeline, Stage
+from . import profiler
+from .fetcher import api_call_count, fetch_metadata_by_isbns
+from .fetcher import prompt_selection
+from .thumbnails import warm_thumbnails
 
 # TODO interactive renamer and author input for when there is a total miss
 # Also a query editor in case the user wants to manually query the metadata
@@ -15,17 +34,61 @@ def is_ext_valid(ext):
     return ext in valid_file_extensions
 
 
+# Walks find_dir depth first with os.scandir, yielding every book as soon
+# as its directory is read instead of building the whole list first
+def iter_all_files(find_dir):
+    dirs = [find_dir]
+    while dirs:
+        dirpath = dirs.pop()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    # Not a symlink to a directory named like a book
+                    elif entry.is_file() \
+                            and is_ext_valid(os.path.splitext(entry.name)[1]):
+                        yield entry.path
+        except OSError:
+            continue  # unreadable directories are skipped, like os.walk
+        dirs.extend(reversed(subdirs))
+
+
 def find_all_files(find_dir):
-    all_files = []
-    for dirpath, _, filenames in os.walk(find_dir):
-        for file in filenames:
-            ext = os.path.splitext(file)[1]
-            if not is_ext_valid(ext):
-                continue
+    return list(iter_all_files(find_dir))
+
+
+class FileDiscovery():
+    """
+    Runs iter_all_files on a background thread so the books can be processed
+    while the tree is still being scanned. found is the running total and
+    done tells whether it is final.
+    """
+    def __init__(self, find_dir, buffer_size=DISCOVERY_BUFFER):
+        self.found = 0
+        self.done = False
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._thread = threading.Thread(
+            target=self._walk, args=(find_dir,), daemon=True
+            )
+        self._thread.start()
+
+    def _walk(self, find_dir):
+        try:
+            for file in iter_all_files(find_dir):
+                self.found += 1
+                self._queue.put(file)
+        finally:
+            self.done = True
+            self._queue.put(None)
 
-            full_path = os.path.join(dirpath, file)
-            all_files.append(full_path)
-    return all_files
+    def __iter__(self):
+        while True:
+            file = self._queue.get()
+            if file is None:
+                return
+            yield file
 
 
 # find all the categories defined in a list of books
@@ -37,32 +100,284 @@ def standardize_categories(list_of_books):
     # TODO group categories together and standardize names
 
 
+# Files organized by the interrupted run being resumed, or known to the
+# manifest as unchanged, are replayed without any I/O and come out already
+# organized, so the later stages let them pass through
+def open_book(file, interactive=False, output_path_dir=None, manifest=None,
+              journal=None, hedge_delay=None, defer_review=False):
+    book = Book(
+        file,
+        interactive_organizer=interactive,
+        output_path_dir=output_path_dir,
+        hedge_delay=hedge_delay,
+        defer_review=defer_review
+        )
+
+    record = journal.lookup(file) if journal else None
+    if record:
+        log("[INFO]", f"Organized before the interruption: '{file}'")
+        book.restore(record)
+        return book
+
+    record = manifest.lookup(file) if manifest else None
+    if record:
+        log("[INFO]", f"Unchanged since last run: '{file}'")
+        book.restore(record)
+        book.in_manifest = True
+    return book
+
+
+# Pipeline stages, see build_pipeline
+
+def extract_stage(book, extractor=None):
+    if book.organized:
+        return book
+
+    if extractor:
+        book.embedded_metadata, records = extractor.submit(
+            extract_metadata_logged, book.fullpath
+            ).result()
+        replay_log(records)
+    else:
+        book.embedded_metadata = extract_metadata_safe(book.fullpath)
+    return book
+
+
+# Resolves the ISBNs of a batch of books in a few Open Library requests.
+# Books it does not resolve are looked up one by one in the fetch stage,
+# on the other providers if Open Library answered that it does not know them
+def isbn_stage(books):
+    wanted = {}
+    for book in books:
+        if not book.organized:
+            isbn = book.isbn_to_fetch(book.embedded_metadata)
+            if isbn:
+                wanted[book] = isbn
+
+    if wanted:
+        found = fetch_metadata_by_isbns(list(wanted.values()))
+        for book, isbn in wanted.items():
+            book.isbn_metadata = found.get(isbn)
+            book.isbn_answered = isbn in found
+    return books
+
+
+# With warm the lookups run ahead of the prompts, their lines would cut
+# through the one the user is reading, so they only go to the logfile
+def fetch_stage(book, warm=False):
+    if book.organized:
+        return book
+    with quiet_output(warm):
+        book.find_metadata(book.embedded_metadata)
+        if warm and can_display_images():
+            warm_thumbnails(book.review_candidates)
+    return book
+
+
+# Asks about the books whose lookups ran ahead of the prompts, one at a time
+def select_stage(book):
+    if book.organized or not book.needs_review():
+        return book
+    book.metadata = prompt_selection(book.review_candidates)
+    book.review_candidates = []
+    return book
+
+
+# Books held aside for review are left as they are until reviewed
+def categorize_stage(book, journal=None):
+    if book.organized or book.needs_review():
+        return book
+
+    book.categorize()
+    if journal:
+        journal.record_organized(book)
+    return book
+
+
+# The CPU-bound extraction (on a process pool with procs), the batched ISBN
+# lookups, the network-bound lookups and the categorizing each get their own
+# workers and bounded queue. With select, the interactive prompts get a
+# stage of their own, so the lookups of the next books and the download of
+# their covers go on while the user reads one.
+# The moves are applied by the caller, in discovery order, on its own thread
+def build_pipeline(jobs=1, procs=0, extractor=None, journal=None,
+                   select=False):
+    fetch = [Stage(
+        "fetch", lambda book: fetch_stage(book, warm=select), workers=jobs
+        )]
+    if select:
+        fetch.append(Stage("select", select_stage))
+    return Pipeline([
+        Stage(
+            "extract",
+            lambda book: extract_stage(book, extractor),
+            workers=procs or 1
+            ),
+        Stage(
+            "isbn",
+            isbn_stage,
+            batch_size=ISBN_BATCH_SIZE,
+            batch_wait=ISBN_BATCH_WAIT
+            ),
+        *fetch,
+        Stage(
+            "categorize",
+            lambda book: categorize_stage(book, journal)
+            ),
+        ], label=lambda book: book.fullpath)
+
+
+# Files a byte-identical copy of an already organized book without looking
+# it up again: either next to it, reusing its record, or under duplicates/
+def organize_duplicate(file, record, mode="reuse", copy_number=1,
+                       output_path_dir=None):
+    book = Book(file, output_path_dir=output_path_dir)
+
+    if mode == "reuse" and record:
+        book.restore(record)
+        name, ext = extract_file_extension(book.new_filename)
+        book.new_filename = f"{name} ({copy_number}){ext}"
+    else:
+        book.categories = ["duplicates"]
+        book.new_filename = book.filename
+
+    book.set_new_path()
+    return book
+
+
 def organize_dir(
     directory,
     output=".",
     dry=False,
     interactive=False,
-    output_path_dir=None
+    output_path_dir=None,
+    jobs=1,
+    procs=0,
+    manifest_path=None,
+    dedupe=None,
+    resume=False,
+    hedge_delay=None,
+    review_path=None,
+    prefetch=PREFETCH_BOOKS
         ):
     if os.path.isfile(directory):
         book = Book(
             directory,
             interactive_organizer=interactive,
-            output_path_dir=output_path_dir
+            output_path_dir=output_path_dir,
+            hedge_delay=hedge_delay
             )
         book.organize_book()
         return book
 
-    all_files = find_all_files(directory)
-    for n in range(len(all_files)):
-        file = all_files[n]
-        if os.path.isfile(file):
-            book = Book(
-                file,
-                interactive_organizer=interactive,
-                output_path_dir=output_path_dir
-                )
-            book.organize_book()
+    manifest = Manifest(manifest_path) if manifest_path else None
+    # A dry run moves nothing, so there is nothing to resume
+    journal = Journal(None if dry else JOURNAL_FILE, resume=resume)
+    review = ReviewQueue(review_path) if review_path else None
+    discovery = FileDiscovery(directory)
+    files = discovery
+    processed = 0
+
+    duplicates = {}
+    if dedupe:
+        # Copies can only be grouped once every file is known, so this
+        # gives up streaming the discovery
+        files = list(discovery)
+        duplicates = find_duplicates(files)
+        files = [file for file in files if file not in duplicates]
+    representatives = set(duplicates.values())
+    records = {}
+
+    def finish(book):
+        nonlocal processed
+        if book.needs_review():
+            log("[INFO]", f"Holding '{book.fullpath}' for review")
+            review.add(book)
+            journal.record_deferred(book)
+            profiler.count("deferred_books")
+        else:
+            identity = file_identity(book.fullpath) if manifest else None
             move_book(book, dry)
+            # Only stored once the move went through. The identity is the
+            # same after the move, so the next run recognizes the book in
+            # the output directory too
+            if identity and not book.in_manifest:
+                manifest.store(
+                    identity, book.new_fullpath or book.fullpath,
+                    book.to_record()
+                    )
+            journal.record_moved(book)
+        profiler.count("books")
+        if book.fullpath in representatives and not book.needs_review():
+            records[book.fullpath] = book.to_record()
+
+        processed += 1
+        display.update(
+            processed,
+            discovery.found,
+            discovering=not discovery.done,
+            api_calls=api_call_count() - api_calls_before,
+            stages=pipeline.stats()
+            )
+
+    extractor = None
+    if procs:
+        # forkserver: the discovery and stage threads must not be forked
+        extractor = ProcessPoolExecutor(
+            max_workers=procs,
+            mp_context=multiprocessing.get_context("forkserver")
+            )
+
+    # Interactive prompts need the terminal: prefetch lookups run ahead
+    # without prompting and the select stage asks about them in turn, or
+    # without prefetch lookups run one at a time. Books deferred to a
+    # review are not prompted for at all
+    select = interactive and not review and prefetch > 0
+    if interactive and not review:
+        jobs = prefetch or 1
+    pipeline = build_pipeline(
+        jobs=jobs,
+        procs=procs,
+        extractor=extractor,
+        journal=journal,
+        select=select
+        )
+    books = (
+        open_book(
+            file, interactive, output_path_dir, manifest, journal,
+            hedge_delay, defer_review=review is not None or select
+            )
+        for file in files
+        if os.path.isfile(file) and not journal.is_settled(file)
+        )
+    completed = False
+    api_calls_before = api_call_count()
+    display = ProgressDisplay()
+
+    try:
+        with display:
+            for book in pipeline.run(books):
+                finish(book)
 
-        progress_bar(len(all_files), n)
+            copies = Counter()
+            for file, representative in duplicates.items():
+                copies[representative] += 1
+                if journal.is_settled(file):
+                    continue
+                log("[INFO]", f"'{file}' is a copy of '{representative}'")
+                finish(organize_duplicate(
+                    file,
+                    records.get(representative),
+                    mode=dedupe,
+                    copy_number=copies[representative],
+                    output_path_dir=output_path_dir
+                    ))
+        completed = True
+    finally:
+        journal.close(completed)
+        if extractor:
+            extractor.shutdown(cancel_futures=True)
+        if manifest:
+            manifest.close()
+        if review:
+            review.close()
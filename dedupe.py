@@ -0,0 +1,58 @@
+# dedupe.py
+
+""" Byte-identical copy detection """
+import os
+import hashlib
+from collections import defaultdict
+
+PARTIAL_HASH_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, limit=None):
+    """Hashes the whole file, or only its first limit bytes."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        if limit is not None:
+            digest.update(f.read(limit))
+        else:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def group_by(files, key):
+    groups = defaultdict(list)
+    for file in files:
+        try:
+            groups[key(file)].append(file)
+        except OSError:
+            continue  # unreadable files are never treated as copies
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(files):
+    """
+    Finds byte-identical files, cheapest checks first: files are grouped by
+    size, then by a hash of their first 64 KiB, and only the ones that still
+    collide are hashed in full.
+    Returns {duplicate: representative}, the representative being the first
+    copy in the order the files were given.
+    """
+    duplicates = {}
+
+    for same_size in group_by(files, os.path.getsize):
+        size = os.path.getsize(same_size[0])
+        for same_start in group_by(
+            same_size, lambda file: hash_file(file, PARTIAL_HASH_SIZE)
+                ):
+            if size <= PARTIAL_HASH_SIZE:
+                copies = [same_start]  # the partial hash was a full one
+            else:
+                copies = group_by(same_start, hash_file)
+
+            for group in copies:
+                for duplicate in group[1:]:
+                    duplicates[duplicate] = group[0]
+
+    return duplicates
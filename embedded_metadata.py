@@ -1,9 +1,11 @@
 import re
+import threading
 
 from typing import Optional, Dict
 
-from .formatter import log
+from .formatter import log, captured_log
 from .extractor import extract_file_extension
+from .profiler import timed
 
 try:
     import fitz  # PyMuPDF
@@ -17,7 +19,11 @@ except ImportError:
     log("[ERROR]", "failed to import ebooklib")
     epub = None
 
+# PyMuPDF is not thread-safe, so documents are only opened one at a time
+_fitz_lock = threading.Lock()
 
+
+@timed("extract_metadata")
 def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
     ext = extract_file_extension(file_path)[1]
     if ext == ".pdf" and fitz:
@@ -28,6 +34,24 @@ def extract_metadata(file_path: str) -> Dict[str, Optional[str]]:
         return {}
 
 
+# A broken file must not take down the pool
+def extract_metadata_safe(file_path: str) -> Dict[str, Optional[str]]:
+    try:
+        return extract_metadata(file_path)
+    except Exception as e:
+        log("[WARN]", f"Failed to extract embedded metadata: {e}")
+        return {}
+
+
+# Used as the process pool target. The lines it logs are returned with the
+# metadata for the parent to write: a pool worker writing the logfile on
+# its own would race the parent when it rotates
+def extract_metadata_logged(file_path: str):
+    with captured_log() as records:
+        metadata = extract_metadata_safe(file_path)
+    return metadata, records
+
+
 def extract_pdf_metadata(file_path: str) -> Dict[str, Optional[str]]:
     meta = {
         "title": None,
@@ -37,7 +61,7 @@ def extract_pdf_metadata(file_path: str) -> Dict[str, Optional[str]]:
         # "publisher": None,
     }
 
-    with fitz.open(file_path) as doc:
+    with _fitz_lock, fitz.open(file_path) as doc:
         pdf_meta = doc.metadata or {}
 
         meta['title'] = pdf_meta.get('title')
@@ -2,6 +2,7 @@
 
 """ Data extractors from filename """
 import re
+from unidecode import unidecode
 from .config import valid_file_extensions
 
 
@@ -26,6 +27,20 @@ def extract_isbn_from_filename(filename):
     return match.group(0) if match else None
 
 
+def normalize_text(text):
+    """Lowercase ASCII words of text, for matching titles and authors."""
+    return " ".join(re.findall(r"[a-z0-9]+", unidecode(text).lower()))
+
+
+def normalize_isbn(isbn):
+    """ISBN without separators and with an uppercase check digit."""
+    return normalize_text(str(isbn)).replace(" ", "").upper()
+
+
+def title_author_key(author, title):
+    return f"{normalize_text(author)}/{normalize_text(title)}"
+
+
 def extract_isbn_from_industry_ids(identifiers):
     for id_obj in identifiers:
         if "ISBN_13" in id_obj.get("type", ""):
@@ -1,10 +1,34 @@
 # fetcher.py
 
+import re
+import json
+import time
+import threading
+from contextlib import closing
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit, urlencode
 import requests
-from .formatter import print_selection, log
+from requests.adapters import HTTPAdapter
+from .formatter import print_selection, log, log_context
+from .formatter import current_log_context, suspend_progress
+from .formatter import quiet_output, output_is_quiet
 from .config import GOOGLE_BOOKS_API, OPEN_LIBRARY_API
+from .config import OPEN_LIBRARY_SEARCH_API
+from .config import MAX_CONNECTIONS_PER_HOST, MAX_LOOKUPS_IN_FLIGHT
+from .config import HTTP_TIMEOUT, GOOGLE_BOOKS_MAX_RESULTS, ISBN_BATCH_SIZE
+from .config import HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES, HTTP_MISS_TTL
+from .config import API_RATE_LIMITS, HTTP_RETRIES, HTTP_RETRY_STATUSES
+from .config import HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+from . import profiler
+from . import thumbnails
+from .http_cache import ResponseCache, CachedResponse, normalize_url
+from .ratelimit import TokenBucket, backoff_delay, retry_after
+from .breaker import CircuitBreaker
 from .extractor import extract_isbn_from_industry_ids
-from .extractor import check_author_in_filename
+from .parser import parse_filename
+from .ranking import rank_candidates, is_good_match
+from .extractor import normalize_isbn, title_author_key
+from .offline_index import COVER_URL
 
 
 # TODO Show image links in terminal
@@ -19,6 +43,277 @@ from .extractor import check_author_in_filename
 # TODO let the user browse more of the request results
 
 
+_session = None
+_executor = None
+_client_lock = threading.Lock()
+_api_calls = 0
+# host -> TokenBucket, for the hosts listed in API_RATE_LIMITS
+_buckets = {}
+# host -> CircuitBreaker of every host requests were sent to
+_breakers = {}
+# normalized URL -> Future of the request in flight for it
+_in_flight = {}
+_cache = None
+_refresh = False
+_offline = False
+# Per thread: whether the last Google Books query failed
+_lookup_state = threading.local()
+
+
+def get_session():
+    """Returns the shared keep-alive session used for every API call."""
+    global _session
+    with _client_lock:
+        if _session is None:
+            # pool_block makes extra threads wait for a free connection
+            # instead of opening more than MAX_CONNECTIONS_PER_HOST
+            adapter = HTTPAdapter(
+                pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                pool_block=True
+                )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def api_call_count():
+    """Requests sent to the metadata APIs since the program started."""
+    return _api_calls
+
+
+def configure_cache(path, refresh=False):
+    """
+    Serves API responses from a persistent cache at path. With refresh
+    the cached responses are ignored and replaced by fresh ones.
+    """
+    global _cache, _refresh
+    close_cache()
+    _cache = ResponseCache(path, HTTP_CACHE_MAX_BYTES)
+    _refresh = refresh
+
+
+def set_offline(offline=True):
+    """Offline, only cached responses are served and nothing is sent."""
+    global _offline
+    _offline = offline
+    thumbnails.set_offline(offline)
+
+
+def close_cache():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def http_get(url):
+    cache = _cache
+    if cache is not None and not _refresh:
+        cached = cache.get(url)
+        if cached is not None:
+            profiler.count("cache_hits")
+            return cached
+
+    if _offline:
+        raise requests.ConnectionError(f"Offline, not sending: {url}")
+
+    # Single flight: concurrent callers asking for the same URL wait for
+    # the one request already in flight and share its response
+    key = normalize_url(url)
+    with _client_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = Future()
+    if not leader:
+        profiler.count("coalesced_requests")
+        return flight.result()
+
+    try:
+        response = _send_guarded(url)
+        results = _has_results(response)
+        if cache is not None and response.status_code == 200 \
+                and results is not None:
+            # Empty results are kept only as long as a miss, so books that
+            # were not found are looked up again once their miss expires
+            ttl = HTTP_CACHE_TTL if results else HTTP_MISS_TTL
+            cache.put(url, response, ttl)
+    except BaseException as e:
+        flight.set_exception(e)
+        raise
+    else:
+        flight.set_result(response)
+    finally:
+        with _client_lock:
+            del _in_flight[key]
+    return response
+
+
+def _host_bucket(host):
+    with _client_lock:
+        if host not in _buckets and host in API_RATE_LIMITS:
+            _buckets[host] = TokenBucket(API_RATE_LIMITS[host])
+        return _buckets.get(host)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host that keeps failing."""
+
+
+def host_breaker(host):
+    with _client_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def _send_guarded(url):
+    """
+    Sends url through the circuit breaker of its host, which records how
+    long the host took to answer, and whether it failed. Only the time
+    spent in the requests themselves counts, retries included: the waits
+    for the rate limit and between retries are this client's own doing.
+    """
+    host = urlsplit(url).netloc
+    breaker = host_breaker(host)
+    if not breaker.allow():
+        profiler.count("circuit_open_skips")
+        raise CircuitOpenError(f"{host} is unavailable, not sending: {url}")
+    timings = []
+    try:
+        response = _send_with_retries(url, timings)
+    except requests.RequestException:
+        breaker.record(sum(timings), False)
+        raise
+    except BaseException:
+        # Says nothing about the host, but must not hold a trial forever
+        breaker.release()
+        raise
+    breaker.record(
+        sum(timings),
+        response.status_code not in HTTP_RETRY_STATUSES
+        )
+    return response
+
+
+# timings, if given, gets the seconds every attempt took
+def _send_with_retries(url, timings=None):
+    """
+    Sends a GET within the rate limit of the host. Connection errors,
+    timeouts and HTTP_RETRY_STATUSES responses are retried with jittered
+    exponential backoff, or after the delay the server's Retry-After asks
+    for, which also holds back every other request to that host. Waits
+    longer than HTTP_BACKOFF_MAX are not retried.
+    """
+    global _api_calls
+    bucket = _host_bucket(urlsplit(url).netloc)
+    for attempt in range(HTTP_RETRIES + 1):
+        if bucket is not None:
+            bucket.acquire()
+        with _client_lock:
+            _api_calls += 1
+        profiler.count("api_calls")
+
+        start = time.monotonic()
+        try:
+            response = get_session().get(url, timeout=HTTP_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == HTTP_RETRIES:
+                raise
+            reason = str(e)
+            delay = backoff_delay(
+                attempt, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+                )
+        else:
+            if response.status_code not in HTTP_RETRY_STATUSES \
+                    or attempt == HTTP_RETRIES:
+                return response
+            reason = f"HTTP {response.status_code}"
+            delay = retry_after(response)
+            if delay is not None and delay > HTTP_BACKOFF_MAX:
+                return response  # e.g. the daily quota ran out
+            if delay is not None and bucket is not None:
+                bucket.pause(delay)
+            if delay is None:
+                delay = backoff_delay(
+                    attempt, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+                    )
+        finally:
+            if timings is not None:
+                timings.append(time.monotonic() - start)
+
+        log(
+            "[WARN]",
+            f"{reason}, retrying in {delay:.1f}s: {url}",
+            noprint=True
+            )
+        profiler.count("retries")
+        time.sleep(delay)
+
+
+# None for a body that is not JSON, e.g. an error page, which is not cached
+def _has_results(response):
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return bool(data)
+    return bool(
+        data.get("items") or data.get("docs")
+        or any(key.startswith("ISBN:") for key in data)
+        )
+
+
+def _is_known_miss(key):
+    if _cache is None or _refresh or not _cache.is_miss(key):
+        return False
+    log("[INFO]", f"Skipping lookup that found nothing before: {key}")
+    profiler.count("negative_cache_hits")
+    return True
+
+
+def _record_miss(key):
+    if _cache is not None:
+        _cache.record_miss(key, HTTP_MISS_TTL)
+
+
+def _get_executor():
+    global _executor
+    with _client_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_LOOKUPS_IN_FLIGHT,
+                thread_name_prefix="book_org-fetch"
+                )
+    return _executor
+
+
+# The volumeInfo fields parse_metadata reads: the only ones requested
+VOLUME_FIELDS = (
+    "title",
+    "authors",
+    "publishedDate",
+    "industryIdentifiers",
+    "publisher",
+    "categories",
+    "imageLinks/thumbnail",
+)
+
+
+def google_books_url(query, max_results=GOOGLE_BOOKS_MAX_RESULTS):
+    """
+    URL of a Google Books search for query, asking for max_results results
+    and for only the fields parse_metadata reads (partial response),
+    instead of the full volume resources.
+    """
+    fields = f"items(volumeInfo({','.join(VOLUME_FIELDS)}))"
+    parameters = urlencode({"maxResults": max_results, "fields": fields})
+    return f"{GOOGLE_BOOKS_API}{query}&{parameters}"
+
+
 def parse_metadata(item):
     """Parses Google Books metadata."""
     volume_info = item.get("volumeInfo", {})
@@ -37,33 +332,62 @@ def parse_metadata(item):
     }
 
 
-def fetch_metadata_by_isbn(isbn):
-    """Fetches metadata using ISBN."""
-    url = f"{GOOGLE_BOOKS_API}isbn:{isbn}"
-    response = requests.get(url)
+def _json_object(response):
+    """Body of response, ValueError if it is not a JSON object."""
+    body = response.json()
+    if not isinstance(body, dict):
+        raise ValueError(f"unexpected {type(body).__name__}")
+    return body
+
+
+def parse_google_books_response(response, expected=None):
+    """
+    Returns the parsed result of a Google Books response that best matches
+    expected (see ranking.score_candidate), or the first one without it.
+    Raises ValueError if the body of a 200 response is not a JSON object.
+    """
     if response.status_code == 200:
-        items = response.json().get("items")
+        items = _json_object(response).get("items")
+        if items and expected:
+            candidates = [parse_metadata(item) for item in items]
+            return rank_candidates(candidates, expected)[0][1]
         if items:
             return parse_metadata(items[0])
     return None
 
 
-def fetch_google_books(query: str):
+@profiler.timed("fetch_metadata_by_isbn")
+def fetch_metadata_by_isbn(isbn):
+    """Fetches metadata using ISBN."""
+    isbn = normalize_isbn(isbn)
+    key = f"isbn:{isbn}"
+    if _is_known_miss(key):
+        return None
+    url = google_books_url(f"isbn:{isbn}", max_results=1)
+    try:
+        response = http_get(url)
+        metadata = parse_google_books_response(response)
+    except Exception as e:
+        log("[WARN]", f"Failed to fetch metadata from API: {e}")
+        return None
+    # Only a JSON answer without items says the ISBN is unknown
+    if metadata is None and response.status_code == 200:
+        _record_miss(key)
+    return metadata
+
+
+@profiler.timed("fetch_google_books")
+def fetch_google_books(query: str, expected=None):
     """Helper to query the Google Books API and return parsed results."""
-    url = f"{GOOGLE_BOOKS_API}{query}"
+    url = google_books_url(query)
     log("[INFO]", f"Querying Google Books API: {url}")
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            items = response.json().get("items")
-            if items:
-                # TODO do items[:10] and check the accuracy of the
-                # first 10 metadata results to pick the best one using date
-                # published, publisher name, accuracy of title matching,
-                # number of authors, etc.
-                return parse_metadata(items[0])
+        response = http_get(url)
+        if response.status_code != 200:
+            _lookup_state.failed = True
+        return parse_google_books_response(response, expected)
     except Exception as e:
-        pass
+        _lookup_state.failed = True
         log(
             "[WARN]",
             f"Failed to fetch metadata from API: {e}"
@@ -71,55 +395,345 @@ def fetch_google_books(query: str):
     return None
 
 
+# Query strategies, and whether they swap the author and the title (the
+# results of those are ranked as if the filename had them swapped too)
 SEARCH_PATTERNS = [
-    lambda a, t: f"intitle:{t}+inauthor:{a}" if a and t else "",  # normal
-    lambda a, t: f"intitle:{a}+inauthor:{t}" if a and t else "",  # reversed
-    lambda a, t: f"intitle:{t}" if t else "",                     # just title
-    lambda a, t: f"intitle:{a}" if a else ""                      # just author
+    (lambda a, t: f"intitle:{t}+inauthor:{a}" if a and t else "", False),
+    (lambda a, t: f"intitle:{a}+inauthor:{t}" if a and t else "", True),
+    (lambda a, t: f"intitle:{t}" if t else "", False),   # just title
+    (lambda a, t: f"intitle:{a}" if a else "", False),   # just author
 ]
 
 
+def _run_query(query, expected=None, fields=None, quiet=False):
+    # Returns the metadata found and whether the query failed
+    with log_context(**(fields or {})), quiet_output(quiet):
+        log("[INFO]", f"Trying search query: {query}")
+        _lookup_state.failed = False
+        metadata = fetch_google_books(query, expected)
+        return metadata, _lookup_state.failed
+
+
+def _searches(author, title, filename=""):
+    """
+    The query of every strategy that applies, with the expected metadata
+    to rank its results against.
+    """
+    expected = expected_metadata(author, title, filename)
+    swapped = expected_metadata(title, author, filename)
+    searches = []
+    for strategy, swaps in SEARCH_PATTERNS:
+        query = strategy(author, title)
+        if query:
+            searches.append((query, swapped if swaps else expected))
+    return searches
+
+
+def _search_results(searches, hedge_delay=None):
+    """
+    Yields the result of every (query, expected) search in order. Without
+    hedge_delay the queries are sent one after another. With it the next
+    query is sent whenever the earliest unanswered one has been waited on for
+    hedge_delay seconds (0 sends all of them at once), and the queries
+    not sent yet are cancelled once the caller stops reading.
+    """
+    if hedge_delay is None:
+        for query, expected in searches:
+            yield _run_query(query, expected)
+        return
+
+    executor = _get_executor()
+    fields = current_log_context()
+    quiet = output_is_quiet()
+    futures = []
+
+    def send(index):
+        query, expected = searches[index]
+        futures.append(
+            executor.submit(_run_query, query, expected, fields, quiet)
+            )
+
+    try:
+        for index in range(len(searches)):
+            if len(futures) == index:
+                send(index)
+            while len(futures) < len(searches):
+                done, _ = wait([futures[index]], timeout=hedge_delay)
+                if done:
+                    break
+                profiler.count("hedged_queries")
+                send(len(futures))
+            yield futures[index].result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def expected_metadata(author, title, filename=""):
+    """What the filename says about the book, to rank the results with."""
+    expected = {"title": title, "authors": author}
+    if filename:
+        parsed = parse_filename(filename)
+        expected["year"] = parsed.get("year")
+        expected["publisher"] = parsed.get("publisher")
+    return expected
+
+
+def prompt_selection(options):
+    """Asks which of options is right; None if the user skips."""
+    with suspend_progress():
+        print_selection(options)
+        selection = input(
+            "Select which metadata is correct [0-n], enter to skip: "
+            )
+    if selection.isdigit():
+        index = int(selection)
+        if 0 <= index < len(options):
+            return options[index]
+    return None
+
+
 def fetch_metadata_by_title_author(
     author: str,
     title: str,
     interactive=False,
-    filename=""
+    filename="",
+    hedge_delay=None,
+    candidates=None
 ):
-    """Attempts many strategies to fetch metadata using author and title."""
+    """
+    Attempts many strategies to fetch metadata using author and title.
+    Every result of a strategy is ranked against the filename and the best
+    one is accepted if it is a good match, otherwise the next strategy is
+    tried. hedge_delay sends the later strategies before the earlier ones
+    have answered (see _search_results); the result of the first
+    acceptable strategy is still the one returned. When nothing is
+    accepted, the results are added to the candidates list, if given,
+    instead of being offered to an interactive user.
+    """
+    key = f"title:{title_author_key(author, title)}"
+    if _is_known_miss(key):
+        return None
 
     metadata_options = []
+    failed = False
+    searches = _searches(author, title, filename)
 
-    for strategy in SEARCH_PATTERNS:
-        query = strategy(author, title)
-        if not query:
-            continue
-        log("[INFO]", f"Trying search query: {query}")
-        metadata = fetch_google_books(query)
-        if metadata:
-            if check_author_in_filename([author], filename):
-                return metadata
-            metadata_options.append(metadata)
-
-    if interactive and metadata_options:
-        print_selection(metadata_options)
-        selection = input(
-            "Select which metadata is correct [0-n], enter to skip: "
-            )
-        if selection.isdigit():
-            index = int(selection)
-            if 0 <= index < len(metadata_options):
-                return metadata_options[index]
+    with closing(_search_results(searches, hedge_delay)) as results:
+        for (_, expected), (metadata, query_failed) in zip(searches, results):
+            failed = failed or query_failed
+            if metadata:
+                if is_good_match(metadata, expected):
+                    return metadata
+                metadata_options.append(metadata)
+
+    if candidates is not None:
+        candidates.extend(metadata_options)
+    elif interactive and metadata_options:
+        selected = prompt_selection(metadata_options)
+        if selected:
+            return selected
+
+    # Only a search where every query was answered is a miss, a network
+    # error must not keep the book from being looked up again
+    if not metadata_options and not failed:
+        _record_miss(key)
 
     log("[WARN]", "No metadata found.")
     return None
 
 
+def parse_openlib_metadata(record, isbn=""):
+    """Parses an Open Library books API record (jscmd=data)."""
+    identifiers = record.get("identifiers", {})
+    isbns = identifiers.get("isbn_13") or identifiers.get("isbn_10") or []
+    published = re.search(r"\d{4}", record.get("publish_date", ""))
+    return {
+        "title": record.get("title"),
+        "authors": [
+            author.get("name", "") for author in record.get("authors", [])
+            ],
+        "published": published.group() if published else "",
+        "isbn": isbns[0] if isbns else isbn,
+        "publisher": next(
+            (p.get("name", "") for p in record.get("publishers", [])), ""
+            ),
+        "categories": [
+            subject.get("name", "").lower()
+            for subject in record.get("subjects", [])
+            ],
+        "image_url": record.get("cover", {}).get("medium")
+    }
+
+
+# Every ISBN a batch found is also cached on its own, as the answer to a
+# request for just that ISBN: later runs batch the ISBNs differently, so
+# the response of the whole batch is hardly ever asked for again
+def _openlib_isbn_url(isbn):
+    return f"{OPEN_LIBRARY_API}ISBN:{isbn}"
+
+
+def _cached_openlib_record(isbn):
+    if _cache is None or _refresh:
+        return None
+    cached = _cache.get(_openlib_isbn_url(isbn))
+    if cached is None:
+        return None
+    try:
+        record = _json_object(cached).get(f"ISBN:{isbn}")
+    except ValueError:
+        return None
+    if record:
+        profiler.count("cache_hits")
+    return record
+
+
+def _store_openlib_record(isbn, record):
+    if _cache is not None:
+        body = json.dumps({f"ISBN:{isbn}": record})
+        _cache.put(
+            _openlib_isbn_url(isbn), CachedResponse(200, body),
+            HTTP_CACHE_TTL
+            )
+
+
+def _isbn_batches(isbns):
+    for start in range(0, len(isbns), ISBN_BATCH_SIZE):
+        yield isbns[start:start + ISBN_BATCH_SIZE]
+
+
+@profiler.timed("fetch_metadata_by_isbns")
+def fetch_metadata_by_isbns(isbns):
+    """
+    Fetches the metadata of many ISBNs from Open Library, ISBN_BATCH_SIZE
+    per request. Returns {isbn: metadata} for the ISBNs Open Library
+    answered for, with None as the metadata of those it does not know
+    (also when that is remembered from an earlier lookup); a batch that
+    fails is logged and its ISBNs are left out. ISBNs an earlier lookup
+    found are answered from the cache and not sent again.
+    """
+    found = {}
+    wanted = {}
+    for isbn in isbns:
+        normalized = normalize_isbn(isbn)
+        if not normalized:
+            continue
+        if _is_known_miss(f"openlib-isbn:{normalized}"):
+            found[isbn] = None
+            continue
+        record = _cached_openlib_record(normalized)
+        if record:
+            found[isbn] = parse_openlib_metadata(record, normalized)
+        else:
+            wanted.setdefault(normalized, []).append(isbn)
+
+    for batch in _isbn_batches(list(wanted)):
+        bibkeys = ",".join(f"ISBN:{isbn}" for isbn in batch)
+        url = f"{OPEN_LIBRARY_API}{bibkeys}"
+        log("[INFO]", f"Looking up {len(batch)} ISBNs on Open Library")
+        try:
+            response = http_get(url)
+        except Exception as e:
+            log("[WARN]", f"Failed to fetch metadata from API: {e}")
+            continue
+        if response.status_code != 200:
+            log("[WARN]", f"Open Library answered {response.status_code}")
+            continue
+        try:
+            records = _json_object(response)
+        except ValueError as e:
+            log("[WARN]", f"Unreadable Open Library response: {e}")
+            continue
+
+        for isbn in batch:
+            record = records.get(f"ISBN:{isbn}")
+            if record:
+                _store_openlib_record(isbn, record)
+            else:
+                _record_miss(f"openlib-isbn:{isbn}")
+            metadata = parse_openlib_metadata(record, isbn) if record \
+                else None
+            for requested in wanted[isbn]:
+                found[requested] = metadata
+    return found
+
+
 def fetch_metadata_by_isbn_openlib(isbn):
     """Fetches metadata using ISBN."""
-    url = f"{OPEN_LIBRARY_API}isbn={isbn}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        items = response.json().get("items")
-        if items:
-            return parse_metadata(items[0])
-    return None
+    return fetch_metadata_by_isbns([isbn]).get(isbn)
+
+
+OPENLIB_SEARCH_FIELDS = (
+    "title",
+    "author_name",
+    "first_publish_year",
+    "isbn",
+    "publisher",
+    "subject",
+    "cover_i",
+)
+
+
+def openlib_search_url(author, title, max_results=GOOGLE_BOOKS_MAX_RESULTS):
+    """
+    URL of an Open Library search for title and, if given, author, asking
+    only for the fields parse_openlib_search_doc reads.
+    """
+    params = {"title": title}
+    if author:
+        params["author"] = author
+    params["limit"] = max_results
+    params["fields"] = ",".join(OPENLIB_SEARCH_FIELDS)
+    return f"{OPEN_LIBRARY_SEARCH_API}{urlencode(params)}"
+
+
+def parse_openlib_search_doc(doc):
+    """Parses a document of the Open Library search API."""
+    isbns = doc.get("isbn", [])
+    return {
+        "title": doc.get("title"),
+        "authors": doc.get("author_name", []),
+        "published": str(doc.get("first_publish_year", "")),
+        "isbn": isbns[0] if isbns else "",
+        "publisher": next(iter(doc.get("publisher", [])), ""),
+        "categories": [
+            subject.lower() for subject in doc.get("subject", [])
+            ],
+        "image_url":
+            COVER_URL.format(doc["cover_i"]) if doc.get("cover_i") else None
+    }
+
+
+def fetch_metadata_by_title_author_openlib(author, title, filename=""):
+    """
+    Searches Open Library for author and title, and returns the best
+    ranked result if it is a good match.
+    """
+    key = f"openlib-title:{title_author_key(author, title)}"
+    if not title or _is_known_miss(key):
+        return None
+
+    log("[INFO]", f"Searching Open Library for: {title}")
+    try:
+        response = http_get(openlib_search_url(author, title))
+    except Exception as e:
+        log("[WARN]", f"Failed to fetch metadata from API: {e}")
+        return None
+    if response.status_code != 200:
+        log("[WARN]", f"Open Library answered {response.status_code}")
+        return None
+
+    try:
+        docs = _json_object(response).get("docs", [])
+    except ValueError as e:
+        log("[WARN]", f"Unreadable Open Library response: {e}")
+        return None
+    if not docs:
+        _record_miss(key)
+        return None
+    expected = expected_metadata(author, title, filename)
+    ranked = rank_candidates(
+        [parse_openlib_search_doc(doc) for doc in docs], expected
+        )
+    best = ranked[0][1]
+    return best if is_good_match(best, expected) else None
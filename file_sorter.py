@@ -2,6 +2,7 @@
 
 import os
 from .formatter import log
+from .profiler import timed
 
 
 def link_file(src, dst):
@@ -11,13 +12,14 @@ def link_file(src, dst):
         pass
 
 
+@timed("move_book")
 def move_book(i, dry=False):
     move = os.rename
     if dry:
         move = link_file
 
-    print(i.new_fullpath)
     if i.new_fullpath:
+        log("[INFO]", f"New path: {i.new_fullpath}")
         # Move the book to the new path
         os.makedirs(i.new_path, exist_ok=True)
         log("[move]", f"'{i.fullpath}' => '{i.new_fullpath}'")
@@ -25,7 +27,7 @@ def move_book(i, dry=False):
 
         # if the book corresponds to more than one category,
         # create a symlink on the other dirs
-        print(i.categories)
+        log("[INFO]", f"Categories: {i.categories}")
         if len(i.categories) > 1:
             for j in i.categories[1:]:
                 newdir = os.path.join(i.output_path_dir, f"{j}")
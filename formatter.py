@@ -2,6 +2,20 @@
 
 import subprocess
 import os
+import sys
+import time
+import shutil
+import threading
+from functools import lru_cache
+from contextlib import contextmanager
+from .logwriter import LogWriter
+from .thumbnails import fetch_thumbnail
+from .config import LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS
+from .config import PROGRESS_REFRESH_INTERVAL, PROGRESS_SUMMARY_INTERVAL
+
+_log_writer = LogWriter(LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS)
+_log_context = threading.local()
+_active_display = None
 
 
 def get_terminal_columns():
@@ -11,19 +25,116 @@ def get_terminal_columns():
         return 80  # Fallback
 
 
-def log(action, text, noprint=False):
-    columns = get_terminal_columns()
-    with open("logfile.txt", "a+") as logfile:
-        logfile.write(f"{action} {text}\n")
-    if noprint:
+def configure_logging(json_lines=False):
+    """Switches the logfile to one JSON object per line."""
+    _log_writer.flush()
+    _log_writer.json_lines = json_lines
+
+
+def json_logging():
+    return _log_writer.json_lines
+
+
+def flush_log():
+    _log_writer.flush()
+
+
+# Fields added to every line logged by this thread inside the block,
+# e.g. the book and stage a pipeline worker is busy with
+@contextmanager
+def log_context(**fields):
+    previous = getattr(_log_context, "fields", {})
+    _log_context.fields = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _log_context.fields = previous
+
+
+def current_log_context():
+    """Fields of the enclosing log_context blocks, to carry to a thread."""
+    return dict(getattr(_log_context, "fields", {}))
+
+
+# Lines logged by this thread in the block only go to the logfile
+@contextmanager
+def quiet_output(quiet=True):
+    previous = output_is_quiet()
+    _log_context.quiet = quiet or previous
+    try:
+        yield
+    finally:
+        _log_context.quiet = previous
+
+
+def output_is_quiet():
+    return getattr(_log_context, "quiet", False)
+
+
+# The lines logged by this thread in the block are kept in the list it
+# yields instead of being written, see replay_log
+@contextmanager
+def captured_log():
+    records = []
+    _log_context.captured = records
+    try:
+        yield records
+    finally:
+        _log_context.captured = None
+
+
+def replay_log(records):
+    """Logs the lines a captured_log block kept, e.g. in a pool worker."""
+    for action, text, noprint, fields in records:
+        log(action, text, noprint, **fields)
+
+
+def log(action, text, noprint=False, **fields):
+    captured = getattr(_log_context, "captured", None)
+    if captured is not None:
+        captured.append((action, text, noprint, fields))
+        return
+    _log_writer.write(
+        action, text, **getattr(_log_context, "fields", {}), **fields
+        )
+    if noprint or output_is_quiet():
+        return
+
+    display = _active_display
+    if display is None:
+        _print_line(action, text)
         return
+    with display.lock:
+        # While the user is being asked something only the asking thread
+        # prints, the others' lines are in the logfile
+        if display.prompting not in (None, threading.get_ident()):
+            return
+        display.clear()
+        _print_line(action, text)
+
 
+def _print_line(action, text):
     if action == "[SEPARATOR]":
+        columns = get_terminal_columns()
         print(action, text[0]*(columns-12))
     else:
         print(action, text)
 
 
+@contextmanager
+def suspend_progress():
+    """
+    Wraps a prompt: the status line is wiped and not redrawn, and other
+    threads print nothing, until the user has answered.
+    """
+    display = _active_display
+    if display is None:
+        yield
+        return
+    with display.suspended():
+        yield
+
+
 def print_selection(dict_list):
     if not dict_list:
         print("No items to display.")
@@ -37,39 +148,150 @@ def print_selection(dict_list):
         print(f"\n\033[1m[{idx}]\033[0m")  # Bold index
         for key, value in item.items():
             if key == "image_url" and value:
-                if show_image:
-                    show_image_in_kitty(value)
+                # Previews are only shown from the local cache, a cover
+                # that cannot be downloaded is left out
+                path = fetch_thumbnail(value) if show_image else None
+                if path:
+                    show_image_in_kitty(path)
             elif value:  # Skip empty fields for clarity
                 print(f"  \033[94m{key.capitalize():<10}\033[0m: {value}")
         print("-"*columns)
     print("\nSelect an item by index")
 
 
-def progress_bar(total, processed):
-    columns = get_terminal_columns()
-    if columns < 6:
-        return
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}m{seconds:02d}s"
 
-    progress_columns = columns-6
 
-    if total == 0:
-        print("100%", "#"*progress_columns)
-        return
+class ProgressDisplay():
+    """
+    Progress of an organize run with throughput, queue depths and ETA.
+    On a terminal a single status line is redrawn in place at most every
+    refresh_interval seconds; otherwise a summary line is printed every
+    summary_interval seconds.
+    """
+    def __init__(self, stream=None, refresh_interval=PROGRESS_REFRESH_INTERVAL,
+                 summary_interval=PROGRESS_SUMMARY_INTERVAL):
+        self.stream = stream or sys.stdout
+        self.is_tty = self.stream.isatty()
+        self.interval = refresh_interval if self.is_tty else summary_interval
+        self.started = time.monotonic()
+        self.last_render = 0.0
+        self.line = ""
+        self.state = {}
+        # Held while writing to the stream, by log() from any thread too
+        self.lock = threading.RLock()
+        # Thread asking the user something, see suspended()
+        self.prompting = None
+
+    def __enter__(self):
+        global _active_display
+        _active_display = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active_display
+        _active_display = None
+        self.close()
+
+    def update(self, processed, total, discovering=False, api_calls=0,
+               stages=None):
+        """stages: {name: {"completed": n, "queued": n}}"""
+        self.state = {
+            "processed": processed, "total": total,
+            "discovering": discovering, "api_calls": api_calls,
+            "stages": stages or {},
+        }
+        now = time.monotonic()
+        if now - self.last_render >= self.interval:
+            self.last_render = now
+            self.render()
+
+    @contextmanager
+    def suspended(self):
+        with self.lock:
+            self.clear()
+            self.stream.flush()
+            self.prompting = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.prompting = None
+
+    def status(self):
+        state = self.state
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        processed, total = state["processed"], state["total"]
+        rate = processed / elapsed
+
+        if state["discovering"]:
+            done = f"{processed}/{total}+"
+            eta = "scanning"
+        else:
+            done = f"{processed}/{total}"
+            eta = format_duration((total - processed) / rate) if rate \
+                else "--"
+
+        parts = [
+            done,
+            f"{rate:.1f} books/s",
+            f"{state['api_calls'] / elapsed:.1f} API/s",
+            f"ETA {eta}",
+            ]
+        for name, stage in state["stages"].items():
+            parts.append(
+                f"{name} {stage['completed'] / elapsed:.1f}/s "
+                f"q{stage['queued']}"
+                )
+        return " | ".join(parts)
 
-    bars_per_completed_file = progress_columns/total
-    fill = processed * bars_per_completed_file
+    def render(self):
+        with self.lock:
+            if not self.state or self.prompting is not None:
+                return
+            if not self.is_tty:
+                self.stream.write(f"[PROGRESS] {self.status()}\n")
+                self.stream.flush()
+                return
 
-    empty = progress_columns-fill
+            columns = get_terminal_columns()
+            state = self.state
+            percentage = 100.0 if not state["total"] else \
+                state["processed"] / state["total"] * 100
+            self.line = f"{percentage:5.1f}% {self.status()}"[:columns - 1]
+            self.stream.write(f"\r\033[K{self.line}")
+            self.stream.flush()
 
-    progress = "#"*int(fill) + " "*int(empty)
+    def clear(self):
+        """Wipes the status line so other output can be printed."""
+        with self.lock:
+            if self.is_tty and self.line:
+                self.stream.write("\r\033[K")
+                self.line = ""
 
-    percentage = f"{(processed / total) * 100:.1f}"
-    print(f"{percentage.rjust(5)}% {progress}")
+    def close(self):
+        with self.lock:
+            self.prompting = None
+            self.render()
+            if self.is_tty and self.line:
+                self.stream.write("\n")
+                self.line = ""
+            self.stream.flush()
 
 
+# Detected once, the terminal does not change during a run
+@lru_cache(maxsize=None)
 def can_display_images():
-    # TODO check if terminal can display images
-    return True
+    """True if covers can be previewed: stdout is a kitty terminal."""
+    is_kitty = os.environ.get("TERM") == "xterm-kitty" \
+        or "KITTY_WINDOW_ID" in os.environ
+    return sys.stdout.isatty() and is_kitty \
+        and shutil.which("kitty") is not None
 
 
 def show_image_in_kitty(image_path):
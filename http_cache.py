@@ -0,0 +1,162 @@
+# http_cache.py
+
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Bumped whenever a table changes; caches of an older layout are emptied
+SCHEMA_VERSION = 1
+
+
+def normalize_url(url):
+    """
+    Cache key of url: lowercase scheme and host, query parameters sorted,
+    and their values lowercased with runs of whitespace collapsed, so
+    queries that only differ in case or spacing share one entry.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (key, " ".join(value.lower().split()))
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        )
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path,
+        urlencode(query),
+        ""
+        ))
+
+
+class CachedResponse():
+    """Stands in for a requests.Response read back from the cache."""
+    from_cache = True
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache():
+    """
+    Persistent cache of API responses keyed by normalized URL, and of the
+    lookups that found nothing. Every entry is kept for the ttl it was
+    stored with, and once the stored bodies outgrow max_bytes the least
+    recently used responses are evicted. Expired entries are deleted
+    when the cache is opened.
+    """
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            version = self._connection.execute(
+                "PRAGMA user_version"
+                ).fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Nothing in a cache is worth migrating, it is refetched
+                self._connection.execute("DROP TABLE IF EXISTS responses")
+                self._connection.execute("DROP TABLE IF EXISTS misses")
+                self._connection.execute(
+                    f"PRAGMA user_version = {SCHEMA_VERSION}"
+                    )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, status INTEGER, body TEXT, "
+                "size INTEGER, expires REAL, accessed REAL)"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS misses ("
+                "key TEXT PRIMARY KEY, expires REAL)"
+                )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed)"
+                )
+            now = time.time()
+            self._connection.execute(
+                "DELETE FROM responses WHERE expires <= ?", (now,)
+                )
+            self._connection.execute(
+                "DELETE FROM misses WHERE expires <= ?", (now,)
+                )
+        self._size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def get(self, url):
+        """Returns the cached response of url, or None if absent or stale."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, body FROM responses "
+                "WHERE url = ? AND expires > ?",
+                (key, now)
+                ).fetchone()
+            if row is None:
+                return None
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE responses SET accessed = ? WHERE url = ?",
+                    (now, key)
+                    )
+        return CachedResponse(*row)
+
+    def put(self, url, response, ttl):
+        key = normalize_url(url)
+        body = response.text
+        size = len(body.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._connection:
+            old = self._connection.execute(
+                "SELECT size FROM responses WHERE url = ?", (key,)
+                ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, body, size, now + ttl, now)
+                )
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Least recently used first, until the cache fits in max_bytes
+        rows = self._connection.execute(
+            "SELECT url, size FROM responses ORDER BY accessed"
+            )
+        evicted = []
+        for url, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            evicted.append((url,))
+            self._size -= size
+        self._connection.executemany(
+            "DELETE FROM responses WHERE url = ?", evicted
+            )
+
+    def is_miss(self, key):
+        """True if a lookup for key found nothing less than its ttl ago."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM misses WHERE key = ? AND expires > ?",
+                (key, time.time())
+                ).fetchone()
+        return row is not None
+
+    def record_miss(self, key, ttl):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO misses VALUES (?, ?)",
+                (key, time.time() + ttl)
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
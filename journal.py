@@ -0,0 +1,92 @@
+# journal.py
+
+import os
+import json
+import threading
+
+
+class Journal():
+    """
+    Write-ahead log of the books of an organize run: one JSON line when a
+    book has been organized and one when it has been moved, or deferred
+    to the review queue instead. Lines are
+    flushed as they are written, so if the run is killed the next one can
+    resume from them instead of starting over. Without a path nothing is
+    kept, e.g. for dry runs.
+    """
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.organized = {}
+        self.moved = set()
+        self.deferred = set()
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            return
+
+        if resume and os.path.exists(path):
+            self._replay()
+            self._drop_partial_line()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # last line cut short by the crash
+                if entry["stage"] == "organized":
+                    self.organized[entry["path"]] = entry["record"]
+                elif entry["stage"] == "moved":
+                    self.moved.add(entry["path"])
+                elif entry["stage"] == "deferred":
+                    self.deferred.add(entry["path"])
+
+    def _drop_partial_line(self):
+        # A line cut short by the crash would otherwise swallow the first
+        # line appended by this run
+        with open(self.path, "rb+") as journal:
+            data = journal.read()
+            if data and not data.endswith(b"\n"):
+                journal.truncate(data.rfind(b"\n") + 1)
+
+    def _write(self, entry):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def lookup(self, file):
+        """Returns the record of file if a previous run organized it."""
+        return self.organized.get(file)
+
+    def is_moved(self, file):
+        return file in self.moved
+
+    def is_settled(self, file):
+        """True if a previous run moved file or queued it for review."""
+        return file in self.moved or file in self.deferred
+
+    def record_organized(self, book):
+        self._write({
+            "stage": "organized",
+            "path": book.fullpath,
+            "record": book.to_record(),
+            })
+
+    def record_moved(self, book):
+        self._write({"stage": "moved", "path": book.fullpath})
+
+    def record_deferred(self, book):
+        self._write({"stage": "deferred", "path": book.fullpath})
+
+    def close(self, completed=False):
+        """Closes the journal, removing it if the run completed."""
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.close()
+        if completed:
+            os.remove(self.path)
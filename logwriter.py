@@ -0,0 +1,131 @@
+# logwriter.py
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+
+
+class LogWriter():
+    """
+    Appends log lines to a file that is kept open, from a background thread
+    that writes whatever has queued up in one batch. The file is rotated to
+    path.1, path.2... once it grows past max_bytes, and reopened if it was
+    removed or the working directory changed.
+    With json_lines, every line is a JSON object that also carries the
+    extra fields given to write (book, stage, duration...).
+    """
+    def __init__(self, path, max_bytes=0, backups=0, json_lines=False,
+                 flush_interval=0.2):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.json_lines = json_lines
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, action, text, **fields):
+        if self._thread is None:
+            self._start()
+        self._queue.put((time.time(), action, text, fields))
+
+    def flush(self):
+        """Blocks until everything written so far is in the file."""
+        if self._thread is None:
+            return
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="book_org-log", daemon=True
+                    )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _format(self, entry):
+        timestamp, action, text, fields = entry
+        if not self.json_lines:
+            return f"{action} {text}\n"
+        return json.dumps({
+            "time": timestamp, "action": action, "message": text, **fields
+            }, default=str) + "\n"
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Take everything else that queued up in the meantime
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [
+                self._format(entry) for entry in batch
+                if isinstance(entry, tuple)
+                ]
+            if lines:
+                self._write("".join(lines))
+
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+            if None in batch:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, data):
+        try:
+            if self._file is None or self._moved():
+                self._open()
+            self._file.write(data)
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            pass  # logging must never stop the organizer
+
+    def _moved(self):
+        try:
+            return os.stat(self.path).st_ino != \
+                os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            return True
+
+    def _open(self):
+        if self._file:
+            self._file.close()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
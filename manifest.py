@@ -0,0 +1,76 @@
+# manifest.py
+
+import os
+import json
+import sqlite3
+import threading
+
+# Bumped whenever the books table changes; older manifests are rebuilt
+SCHEMA_VERSION = 1
+
+
+def file_identity(file):
+    """
+    What a manifest entry is keyed by: device, inode, size and mtime of
+    file, which a rename keeps but any change to the file does not. None
+    if the file cannot be read.
+    """
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class Manifest():
+    """
+    Persistent record of how every file was organized on previous runs.
+    Entries are keyed by file_identity, so a book is still recognized
+    after it was moved into the output directory, while a file that
+    changed in any way is organized again.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            version = self._connection.execute(
+                "PRAGMA user_version"
+                ).fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Entries of an older layout cannot be matched any more
+                self._connection.execute("DROP TABLE IF EXISTS books")
+                self._connection.execute(
+                    f"PRAGMA user_version = {SCHEMA_VERSION}"
+                    )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS books ("
+                "device INTEGER, inode INTEGER, size INTEGER, "
+                "mtime_ns INTEGER, path TEXT, record TEXT, "
+                "PRIMARY KEY (device, inode, size, mtime_ns))"
+                )
+
+    def lookup(self, file):
+        """Returns the stored record of file if it is unchanged, or None."""
+        identity = file_identity(file)
+        if identity is None:
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT record FROM books WHERE device = ? AND inode = ? "
+                "AND size = ? AND mtime_ns = ?", identity
+                ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, identity, path, record):
+        """Stores record for the file identity (see file_identity) names."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?, ?, ?)",
+                (*identity, path, json.dumps(record))
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,238 @@
+# offline_index.py
+
+import os
+import re
+import gzip
+import json
+import sqlite3
+import threading
+from functools import partial
+from .formatter import log
+from .extractor import normalize_isbn, title_author_key
+from . import profiler
+
+COVER_URL = "https://covers.openlibrary.org/b/id/{}-M.jpg"
+# Rows written per transaction while building an index
+_BATCH = 10000
+
+_index = None
+
+
+def _open_dump(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _read_dump(path):
+    """
+    Yields the JSON records of a dump, either an Open Library dump (type,
+    key, revision, last modified and JSON, tab separated) or JSON lines.
+    """
+    with _open_dump(path) as dump:
+        for line in dump:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            try:
+                yield json.loads(line.rsplit("\t", 1)[-1])
+            except ValueError:
+                log("[WARN]", f"Skipping unreadable dump line: {line[:80]}",
+                    noprint=True)
+
+
+def _author_names(record, resolve=None):
+    names = []
+    for author in record.get("authors", []):
+        if isinstance(author, str):
+            names.append(author)
+        elif author.get("name"):
+            names.append(author["name"])
+        else:
+            key = author.get("key") or author.get("author", {}).get("key")
+            name = resolve(key) if key and resolve else None
+            if name:
+                names.append(name)
+    return names
+
+
+def parse_edition(record, authors=()):
+    """Parses an Open Library edition record into book metadata."""
+    isbns = record.get("isbn_13") or record.get("isbn_10") or []
+    published = re.search(r"\d{4}", record.get("publish_date", ""))
+    covers = [cover for cover in record.get("covers", []) if cover > 0]
+    return {
+        "title": record.get("title"),
+        "authors": list(authors),
+        "published": published.group() if published else "",
+        "isbn": isbns[0] if isbns else "",
+        "publisher": next(iter(record.get("publishers", [])), ""),
+        "categories": [
+            subject.lower() for subject in record.get("subjects", [])
+            if isinstance(subject, str)
+            ],
+        "image_url": COVER_URL.format(covers[0]) if covers else None
+    }
+
+
+def build_index(index_path, editions_path, authors_path=None):
+    """
+    Builds the index at index_path from an editions dump, streaming it so
+    the dump never has to fit in memory. Editions name their authors by
+    key, so an authors dump is needed to index them by author and title;
+    its names are staged in a temporary database next to the index.
+    Returns the number of editions indexed.
+    """
+    building = index_path + ".building"
+    staging = index_path + ".authors"
+    for path in (building, staging):
+        if os.path.exists(path):
+            os.remove(path)
+
+    connection = sqlite3.connect(building)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.executescript(
+        "CREATE TABLE editions (id INTEGER PRIMARY KEY, record TEXT);"
+        "CREATE TABLE isbns (isbn TEXT PRIMARY KEY, edition INTEGER)"
+        " WITHOUT ROWID;"
+        "CREATE TABLE titles (key TEXT, edition INTEGER,"
+        " PRIMARY KEY (key, edition)) WITHOUT ROWID;"
+        )
+
+    resolve = None
+    if authors_path:
+        connection.execute("ATTACH DATABASE ? AS staging", (staging,))
+        connection.execute(
+            "CREATE TABLE staging.authors (key TEXT PRIMARY KEY, name TEXT)"
+            " WITHOUT ROWID"
+            )
+        rows = (
+            (author["key"], author["name"])
+            for author in _read_dump(authors_path)
+            if author.get("key") and author.get("name")
+            )
+        _insert(connection, "INSERT OR REPLACE INTO staging.authors "
+                "VALUES (?, ?)", rows)
+        resolve = partial(_staged_author_name, connection)
+
+    count = 0
+    for edition, record in enumerate(_read_dump(editions_path), 1):
+        if not record.get("title"):
+            continue
+        authors = _author_names(record, resolve)
+        metadata = parse_edition(record, authors)
+        connection.execute(
+            "INSERT INTO editions VALUES (?, ?)",
+            (edition, json.dumps(metadata, separators=(",", ":")))
+            )
+        isbns = record.get("isbn_13", []) + record.get("isbn_10", [])
+        connection.executemany(
+            "INSERT OR IGNORE INTO isbns VALUES (?, ?)",
+            {(normalize_isbn(isbn), edition) for isbn in isbns}
+            )
+        connection.executemany(
+            "INSERT OR IGNORE INTO titles VALUES (?, ?)",
+            {(title_author_key(author, record["title"]), edition)
+             for author in authors}
+            )
+        count += 1
+        if count % _BATCH == 0:
+            connection.commit()
+            log("[INFO]", f"Indexed {count} editions", noprint=True)
+
+    connection.commit()
+    if authors_path:
+        connection.execute("DETACH DATABASE staging")
+        os.remove(staging)
+    connection.close()
+    os.replace(building, index_path)
+    return count
+
+
+def _staged_author_name(connection, key):
+    row = connection.execute(
+        "SELECT name FROM staging.authors WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _insert(connection, statement, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == _BATCH:
+            connection.executemany(statement, batch)
+            connection.commit()
+            batch = []
+    connection.executemany(statement, batch)
+    connection.commit()
+
+
+class OfflineIndex():
+    """
+    Read-only metadata index built by build_index, keyed by ISBN and by
+    normalized author and title. Lookups are single indexed queries.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+            )
+
+    def _fetch(self, query, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT record FROM editions WHERE id = "
+                f"({query} LIMIT 1)", (key,)
+                ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lookup_isbn(self, isbn):
+        return self._fetch(
+            "SELECT edition FROM isbns WHERE isbn = ?", normalize_isbn(isbn)
+            )
+
+    def lookup_title_author(self, author, title):
+        return self._fetch(
+            "SELECT edition FROM titles WHERE key = ?",
+            title_author_key(author, title)
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def open_index(path):
+    """Makes lookup_isbn and lookup_title_author answer from path."""
+    global _index
+    close_index()
+    _index = OfflineIndex(path)
+
+
+def close_index():
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+
+
+# Both return None when no index is open, or the book is not in it
+def lookup_isbn(isbn):
+    if _index is None or not isbn:
+        return None
+    metadata = _index.lookup_isbn(isbn)
+    if metadata:
+        profiler.count("offline_index_hits")
+    return metadata
+
+
+def lookup_title_author(author, title):
+    if _index is None or not (author and title):
+        return None
+    metadata = _index.lookup_title_author(author, title)
+    if metadata:
+        profiler.count("offline_index_hits")
+    return metadata
@@ -3,6 +3,7 @@
 import re
 import os
 from .extractor import extract_series, extract_year, extract_file_extension
+from .profiler import timed
 
 
 def clean_filename(name):
@@ -20,6 +21,7 @@ def parse_annas_filename(filename):
     return {"title": title, "authors": authors}
 
 
+@timed("parse_filename")
 def parse_filename(filename):
     if "Anna’s Archive" in filename:
         return parse_annas_filename(filename)
@@ -0,0 +1,239 @@
+# pipeline.py
+
+import time
+import queue
+import threading
+from . import profiler
+from .formatter import log, log_context, json_logging
+
+_DONE = object()
+_POLL_INTERVAL = 0.1
+
+
+class Stage():
+    """
+    One step of a Pipeline: func is called on every item by workers threads,
+    which take their input from a queue holding at most queue_size items.
+    With a batch_size func is instead called on lists of up to batch_size
+    items, waiting at most batch_wait seconds for a batch to fill, and
+    returns the list of results.
+    """
+    def __init__(self, name, func, workers=1, queue_size=None,
+                 batch_size=1, batch_wait=0):
+        self.name = name
+        self.func = func
+        self.workers = max(workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self.batch_wait = batch_wait
+        self.queue_size = queue_size or self.workers * self.batch_size * 2
+        self.queue = None
+        self.completed = 0
+
+
+class _Failed():
+    def __init__(self, error):
+        self.error = error
+
+
+class Pipeline():
+    """
+    Runs items through a list of stages connected by bounded queues, so the
+    stages overlap instead of alternating and memory stays bounded by the
+    queue sizes. Results are yielded in the order the items came in.
+    An exception raised by a stage is re-raised when its item's turn comes.
+    label(item) names the item in the log lines written while it is in a
+    stage; by default items are numbered in input order.
+    """
+    def __init__(self, stages, output_size=None, label=None):
+        self.stages = stages
+        self.output_size = output_size or stages[-1].workers * 2
+        self.output = None
+        self.label = label
+
+    def queue_depths(self):
+        depths = {
+            stage.name: stage.queue.qsize() if stage.queue else 0
+            for stage in self.stages
+            }
+        depths["output"] = self.output.qsize() if self.output else 0
+        return depths
+
+    def stats(self):
+        """Items done and waiting, per stage."""
+        depths = self.queue_depths()
+        return {
+            stage.name: {
+                "completed": stage.completed, "queued": depths[stage.name]
+                }
+            for stage in self.stages
+            }
+
+    def run(self, items):
+        for stage in self.stages:
+            stage.completed = 0
+            stage.queue = queue.Queue(maxsize=stage.queue_size)
+        self.output = queue.Queue(maxsize=self.output_size)
+
+        # Items finished out of order wait for their turn in run(); limiting
+        # the items in flight keeps that reorder buffer bounded too
+        in_flight = self.output_size + sum(
+            stage.queue_size + stage.workers * stage.batch_size
+            for stage in self.stages
+            )
+        self._slots = threading.Semaphore(in_flight)
+        self._stop = threading.Event()
+        self._count_lock = threading.Lock()
+        self._feed_error = None
+
+        threads = [threading.Thread(target=self._feed, args=(items,))]
+        for n, stage in enumerate(self.stages):
+            downstream = self.stages[n + 1].queue \
+                if n + 1 < len(self.stages) else self.output
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, downstream, remaining, lock),
+                    name=f"book_org-{stage.name}"
+                    ))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        return self._collect()
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, items):
+        try:
+            for seq, item in enumerate(items):
+                while not self._slots.acquire(timeout=_POLL_INTERVAL):
+                    if self._stop.is_set():
+                        return
+                if not self._put(self.stages[0].queue, (seq, item)):
+                    return
+        except Exception as e:
+            self._feed_error = e
+        finally:
+            self._put(self.stages[0].queue, _DONE)
+
+    def _work(self, stage, downstream, remaining, lock):
+        while True:
+            item = self._get(stage.queue)
+            if item is _DONE:
+                self._finish(stage, downstream, remaining, lock)
+                return
+
+            batch = [item]
+            done = False
+            deadline = time.monotonic() + stage.batch_wait
+            while len(batch) < stage.batch_size:
+                try:
+                    item = stage.queue.get(
+                        timeout=max(deadline - time.monotonic(), 0)
+                        )
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+
+            for seq, value in self._process_batch(stage, batch):
+                if not self._put(downstream, (seq, value)):
+                    return
+            if done:
+                self._finish(stage, downstream, remaining, lock)
+                return
+
+    def _finish(self, stage, downstream, remaining, lock):
+        # Let the sibling workers see the end too; the last one out passes
+        # it on to the next stage
+        self._put(stage.queue, _DONE)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            self._put(downstream, _DONE)
+
+    def _process_batch(self, stage, batch):
+        live = [
+            (seq, value) for seq, value in batch
+            if not isinstance(value, _Failed)
+            ]
+        if not live:
+            return batch
+        if stage.batch_size == 1:
+            seq, value = live[0]
+            label = self.label(value) if self.label else seq
+            results = [self._process(stage, label, value)]
+        else:
+            values = [value for _, value in live]
+            results = self._process(
+                stage, f"batch of {len(values)}", values, len(values)
+                )
+            if isinstance(results, _Failed):
+                results = [results] * len(values)
+
+        results = dict(zip((seq for seq, _ in live), results))
+        return [(seq, results.get(seq, value)) for seq, value in batch]
+
+    def _process(self, stage, label, value, count=1):
+        # Stage durations are only of use to a --profile report or to the
+        # JSON lines of --log-json, otherwise the logfile would get a line
+        # per stage of every book
+        timed = profiler.is_enabled() or json_logging()
+        with log_context(book=label, stage=stage.name):
+            start = time.perf_counter() if timed else 0.0
+            try:
+                value = stage.func(value)
+            except Exception as e:
+                value = _Failed(e)
+            with self._count_lock:
+                stage.completed += count
+
+            if timed:
+                duration = time.perf_counter() - start
+                profiler.record(f"stage:{stage.name}", duration)
+                log("[STAGE]", f"{stage.name} {duration:.3f}s",
+                    noprint=True, duration=duration)
+        return value
+
+    def _collect(self):
+        pending = {}
+        next_seq = 0
+        try:
+            while True:
+                item = self._get(self.output)
+                if item is _DONE:
+                    break
+                seq, value = item
+                pending[seq] = value
+                while next_seq in pending:
+                    value = pending.pop(next_seq)
+                    next_seq += 1
+                    self._slots.release()
+                    if isinstance(value, _Failed):
+                        raise value.error
+                    yield value
+
+            if self._feed_error:
+                raise self._feed_error
+        finally:
+            self._stop.set()
@@ -0,0 +1,131 @@
+# profiler.py
+
+""" Per-stage timing instrumentation, enabled by --profile """
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from collections import defaultdict, Counter
+
+_lock = threading.Lock()
+_enabled = False
+_started = 0.0
+_durations = defaultdict(list)
+_counters = Counter()
+
+
+def enable():
+    """Starts recording, discarding anything recorded before."""
+    global _enabled, _started
+    with _lock:
+        _durations.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+        _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(name, duration):
+    if not _enabled:
+        return
+    with _lock:
+        _durations[name].append(duration)
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += n
+
+
+@contextmanager
+def stopwatch(name):
+    """Context manager recording the wall time of its block under name."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator recording the wall time of every call under name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = int(round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summary():
+    with _lock:
+        durations = {name: sorted(d) for name, d in _durations.items()}
+        counters = dict(_counters)
+
+    stages = {}
+    for name, values in sorted(durations.items()):
+        stages[name] = {
+            "count": len(values),
+            "total": sum(values),
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+    books = counters.get("books", 0)
+    return {
+        "wall_time": time.perf_counter() - _started,
+        "stages": stages,
+        "counters": counters,
+        "api_calls_per_book":
+            counters.get("api_calls", 0) / books if books else 0.0,
+    }
+
+
+def report(path=None):
+    """Prints the summary, and writes it as JSON to path if given."""
+    result = summary()
+
+    print(f"\n{'stage':<24}{'count':>8}{'total s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stage in result["stages"].items():
+        print(f"{name:<24}{stage['count']:>8}{stage['total']:>10.2f}"
+              f"{stage['p50'] * 1000:>10.1f}{stage['p95'] * 1000:>10.1f}"
+              f"{stage['p99'] * 1000:>10.1f}")
+    for name, value in sorted(result["counters"].items()):
+        print(f"{name}: {value}")
+    print(f"API calls per book: {result['api_calls_per_book']:.2f}")
+    print(f"Wall time: {result['wall_time']:.2f}s")
+
+    if path:
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
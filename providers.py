@@ -0,0 +1,134 @@
+# providers.py
+
+"""
+Routes metadata lookups between the APIs. Each provider is tried in turn
+until one finds the book: providers whose circuit breaker is open are
+skipped without a request, and slow ones are asked after the others.
+"""
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+from .config import PROVIDER_SLOW_LATENCY
+from .formatter import log
+from . import fetcher
+
+
+class Provider(ABC):
+    """
+    A metadata API. Its health is the circuit breaker fetcher keeps for
+    its host, which knows the latency and errors of its recent requests.
+    """
+    name = ""
+
+    @property
+    def host(self):
+        return urlsplit(self.api()).netloc
+
+    @abstractmethod
+    def api(self):
+        """URL of the API, which names the host."""
+
+    @property
+    def breaker(self):
+        return fetcher.host_breaker(self.host)
+
+    def available(self):
+        return self.breaker.state != "open"
+
+    def slow(self):
+        return self.breaker.latency() > PROVIDER_SLOW_LATENCY
+
+    @abstractmethod
+    def lookup_isbn(self, isbn):
+        """Metadata of isbn, or None."""
+
+    @abstractmethod
+    def lookup_title_author(self, author, title, **options):
+        """
+        Metadata of the book by author and title, or None. options are
+        those of fetcher.fetch_metadata_by_title_author.
+        """
+
+
+class GoogleBooks(Provider):
+    name = "Google Books"
+
+    def api(self):
+        return fetcher.GOOGLE_BOOKS_API
+
+    def lookup_isbn(self, isbn):
+        return fetcher.fetch_metadata_by_isbn(isbn)
+
+    def lookup_title_author(self, author, title, **options):
+        return fetcher.fetch_metadata_by_title_author(author, title, **options)
+
+
+class OpenLibrary(Provider):
+    name = "Open Library"
+
+    def api(self):
+        return fetcher.OPEN_LIBRARY_API
+
+    def lookup_isbn(self, isbn):
+        return fetcher.fetch_metadata_by_isbn_openlib(isbn)
+
+    def lookup_title_author(self, author, title, **options):
+        # Results are never offered for selection, and one search needs
+        # no hedging
+        return fetcher.fetch_metadata_by_title_author_openlib(
+            author, title, options.get("filename", "")
+            )
+
+
+# In order of preference
+PROVIDERS = [GoogleBooks(), OpenLibrary()]
+
+
+def ranked_providers():
+    """Available providers in the order to ask them, slow ones last."""
+    available = [provider for provider in PROVIDERS if provider.available()]
+    if len(available) < len(PROVIDERS):
+        skipped = [p.name for p in PROVIDERS if p not in available]
+        log("[INFO]", f"Skipping unavailable providers: {', '.join(skipped)}",
+            noprint=True)
+    return sorted(available, key=lambda provider: provider.slow())
+
+
+# skip names providers that already answered they do not know isbn
+def fetch_metadata_by_isbn(isbn, skip=()):
+    for provider in ranked_providers():
+        if provider.name in skip:
+            continue
+        metadata = provider.lookup_isbn(isbn)
+        if metadata:
+            return metadata
+    return None
+
+
+def fetch_metadata_by_title_author(
+    author,
+    title,
+    interactive=False,
+    filename="",
+    hedge_delay=None,
+    candidates=None
+):
+    """
+    Metadata of the first provider that finds the book. If one only finds
+    candidates to choose from (added to candidates), the others are not
+    asked: the choice is the user's.
+    """
+    for provider in ranked_providers():
+        offered = len(candidates) if candidates is not None else 0
+        metadata = provider.lookup_title_author(
+            author,
+            title,
+            interactive=interactive,
+            filename=filename,
+            hedge_delay=hedge_delay,
+            candidates=candidates
+            )
+        if metadata:
+            return metadata
+        if candidates is not None and len(candidates) > offered:
+            return None
+    return None
@@ -0,0 +1,100 @@
+# ranking.py
+
+""" Scores metadata candidates against what the filename says """
+import re
+from difflib import SequenceMatcher
+from .extractor import normalize_text
+from .config import MATCH_THRESHOLD
+
+# How much each comparison counts. Comparisons the filename has nothing to
+# compare with are left out and the rest are scaled up to a 0-1 score
+WEIGHTS = {
+    "title": 0.5,
+    "authors": 0.3,
+    "year": 0.1,
+    "publisher": 0.1,
+}
+
+
+def _words(text):
+    return set(word for word in normalize_text(text).split() if len(word) > 2)
+
+
+def title_similarity(expected, candidate):
+    """
+    Similarity of two titles from 0 to 1. A candidate whose main title
+    (before a colon) is the expected title also matches, since filenames
+    often leave the subtitle out.
+    """
+    expected = normalize_text(expected)
+    if not expected or not candidate:
+        return 0.0
+    return max(
+        SequenceMatcher(None, expected, normalize_text(title)).ratio()
+        for title in (candidate, candidate.split(":")[0])
+        )
+
+
+def author_overlap(expected, candidates):
+    """Share of the expected author's name words found in candidates."""
+    words = _words(expected)
+    if not words:
+        return 0.0
+    found = set()
+    for author in candidates:
+        found |= _words(author)
+    return len(words & found) / len(words)
+
+
+def year_match(expected, candidate):
+    try:
+        distance = abs(int(expected) - int(candidate))
+    except (TypeError, ValueError):
+        return 0.0
+    # Reprints and different editions are often a year off
+    return {0: 1.0, 1: 0.5}.get(distance, 0.0)
+
+
+def publisher_overlap(expected, candidate):
+    words = _words(expected)
+    if not words:
+        return 0.0
+    return len(words & _words(candidate or "")) / len(words)
+
+
+def score_candidate(candidate, expected):
+    """
+    Scores candidate metadata from 0 to 1 against expected, the parsed
+    filename: its title, authors and, when present, year and publisher.
+    """
+    scores = {"title": title_similarity(
+        expected.get("title") or "", candidate.get("title") or ""
+        )}
+    if expected.get("authors"):
+        scores["authors"] = author_overlap(
+            expected["authors"], candidate.get("authors") or []
+            )
+    if expected.get("year") and re.fullmatch(r"\d{4}", expected["year"]):
+        scores["year"] = year_match(
+            expected["year"], candidate.get("published")
+            )
+    if expected.get("publisher"):
+        scores["publisher"] = publisher_overlap(
+            expected["publisher"], candidate.get("publisher")
+            )
+    total = sum(WEIGHTS[name] for name in scores)
+    return sum(WEIGHTS[name] * score for name, score in scores.items()) \
+        / total
+
+
+def rank_candidates(candidates, expected):
+    """Candidates and their scores, best first (ties keep API order)."""
+    scored = [
+        (score_candidate(candidate, expected), candidate)
+        for candidate in candidates
+        ]
+    return sorted(scored, key=lambda pair: pair[0], reverse=True)
+
+
+def is_good_match(candidate, expected, threshold=MATCH_THRESHOLD):
+    return score_candidate(candidate, expected) >= threshold
@@ -0,0 +1,69 @@
+# ratelimit.py
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket():
+    """
+    Lets through rate requests per second on average and bursts of up to
+    capacity. Threads that find the bucket empty wait for a token, and
+    pause() holds every caller back, e.g. while a server asks us to.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                    )
+                self._updated = now
+                if now >= self._resume_at and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(
+                    self._resume_at - now,
+                    (1 - self._tokens) / self.rate
+                    )
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._resume_at = max(
+                self._resume_at, time.monotonic() + seconds
+                )
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(response):
+    """
+    Seconds the Retry-After header of response asks to wait, or None if
+    it has none. The header is either a number of seconds or a date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
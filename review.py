@@ -0,0 +1,93 @@
+# review.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from .Book import Book
+from .file_sorter import move_book
+from .formatter import print_selection, log, suspend_progress
+
+
+class ReviewQueue():
+    """
+    Books held aside by a --defer run: their lookups found candidates but
+    none good enough to take without asking. Each is stored with its
+    candidates and output directory until `book_org review` settles it.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS books ("
+                "path TEXT PRIMARY KEY, output_dir TEXT, candidates TEXT, "
+                "added REAL)"
+                )
+
+    def add(self, book):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?)",
+                (book.fullpath, book.output_path_dir,
+                 json.dumps(book.review_candidates), time.time())
+                )
+
+    def pending(self):
+        """(path, output directory, candidates) of every book, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, output_dir, candidates FROM books "
+                "ORDER BY added"
+                ).fetchall()
+        return [(path, output, json.loads(found))
+                for path, output, found in rows]
+
+    def remove(self, path):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM books WHERE path = ?", (path,)
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def review_books(queue, dry=False):
+    """
+    Asks which candidate is right for every queued book, then organizes
+    and moves it. Skipped books stay queued for the next review.
+    """
+    pending = queue.pending()
+    log("[INFO]", f"{len(pending)} books waiting for review")
+    for file, output_dir, candidates in pending:
+        if not os.path.isfile(file):
+            log("[WARN]", f"'{file}' is gone, dropping it from the queue")
+            queue.remove(file)
+            continue
+
+        with suspend_progress():
+            print(f"\n{file}")
+            print_selection(candidates)
+            selection = input(
+                "Select which metadata is correct [0-n], n for none, "
+                "enter to skip, q to quit: "
+                ).strip().lower()
+        if selection == "q":
+            break
+        if selection == "n":
+            metadata = {}
+        elif selection.isdigit() and int(selection) < len(candidates):
+            metadata = candidates[int(selection)]
+        else:
+            continue
+
+        book = Book(file, output_path_dir=output_dir)
+        book.metadata = metadata
+        book.categorize()
+        move_book(book, dry)
+        if not dry:
+            queue.remove(file)
@@ -0,0 +1,61 @@
+# tests/test_benchmarks.py
+
+import os
+import random
+import requests
+from book_org.benchmarks.synthetic_library import generate_library, isbn13
+from book_org.benchmarks.fake_google_books import FakeGoogleBooks
+from book_org.embedded_metadata import extract_metadata_safe
+from book_org.extractor import extract_file_extension
+
+
+def test_isbn13_check_digit_is_valid():
+    isbn = isbn13(random.Random(1))
+    digits = [int(d) for d in isbn]
+    assert len(isbn) == 13
+    assert sum(d * (3 if n % 2 else 1) for n, d in enumerate(digits)) \
+        % 10 == 0
+
+
+def test_generate_library_writes_readable_books(tmp_path):
+    books = generate_library(str(tmp_path), 30, seed=3, files_per_dir=10)
+
+    assert len(books) == 30
+    assert len(os.listdir(tmp_path)) == 3
+    for path in books:
+        assert os.path.exists(path)
+        assert extract_file_extension(path) is not None
+        if path.endswith((".pdf", ".epub")):
+            assert extract_metadata_safe(path) != {}
+
+
+def test_fake_google_books_answers_queries():
+    with FakeGoogleBooks(latency=0, miss_rate=0) as server:
+        response = requests.get(f"{server.url}intitle:Chess+inauthor:Polgar")
+
+    item = response.json()["items"][0]["volumeInfo"]
+    assert item["title"] == "Chess"
+    assert item["authors"] == ["Polgar"]
+    assert server.requests == 1
+
+
+def test_fake_open_library_answers_bibkeys():
+    with FakeGoogleBooks(latency=0, miss_rate=0) as server:
+        response = requests.get(
+            f"{server.openlib_url}ISBN:9780000000001,ISBN:9780000000002"
+            )
+
+    records = response.json()
+    assert set(records) == {"ISBN:9780000000001", "ISBN:9780000000002"}
+    assert records["ISBN:9780000000001"]["title"] == "Book 9780000000001"
+
+
+def test_fake_open_library_answers_searches():
+    with FakeGoogleBooks(latency=0, miss_rate=0) as server:
+        response = requests.get(
+            f"{server.openlib_search_url}title=Chess&author=Polgar"
+            )
+
+    doc = response.json()["docs"][0]
+    assert doc["title"] == "Chess"
+    assert doc["author_name"] == ["Polgar"]
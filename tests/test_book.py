@@ -34,7 +34,7 @@ def test_find_metadata_with_isbn(
     book.find_metadata()
 
     assert book.metadata["title"] == "Mock Book"
-    mock_fetch_by_isbn.assert_called_once_with("1234567890")
+    mock_fetch_by_isbn.assert_called_once_with("1234567890", skip=[])
     mock_fetch_by_title_author.assert_not_called()
 
 
@@ -209,3 +209,111 @@ def test_set_categories_no_metadata_no_fallback(mock_fallback):
     book.new_filename = "test_book.pdf"
     book.set_categories()
     assert book.categories == ["no-metadata"]
+
+
+def test_to_record_and_restore_round_trip():
+    book = Book("some/path/file.pdf", output_path_dir="old_output")
+    book.metadata = {"title": "Book Title", "categories": ["science"]}
+    book.categories = ["science"]
+    book.new_filename = "Book Title.pdf"
+    book.set_new_path()
+
+    replayed = Book("some/path/file.pdf", output_path_dir="new_output")
+    replayed.restore(book.to_record())
+
+    assert replayed.metadata == book.metadata
+    assert replayed.categories == ["science"]
+    assert replayed.new_fullpath == "new_output/science/Book Title.pdf"
+
+
+@patch("book_org.Book.fetch_metadata_by_isbn")
+@patch("book_org.Book.log")
+def test_find_metadata_filename_isbn_without_embedded_metadata(
+    mock_log, mock_fetch_by_isbn
+):
+    mock_fetch_by_isbn.return_value = {"title": "Mobi Book"}
+
+    book = Book("path/to/Mobi Book 9780132350884.mobi")
+    book.find_metadata({})
+
+    mock_fetch_by_isbn.assert_called_once_with("9780132350884", skip=[])
+    assert book.metadata == {"title": "Mobi Book"}
+
+
+@patch("book_org.Book.fetch_metadata_by_isbn")
+@patch("book_org.Book.log")
+def test_find_metadata_uses_batched_isbn_lookup(mock_log, mock_fetch_by_isbn):
+    book = Book("path/to/Mobi Book 9780132350884.mobi")
+    assert book.isbn_to_fetch({}) == "9780132350884"
+
+    book.isbn_metadata = {"title": "Mobi Book"}
+    book.find_metadata({})
+
+    mock_fetch_by_isbn.assert_not_called()
+    assert book.metadata == {"title": "Mobi Book"}
+
+
+def test_isbn_to_fetch_skips_complete_embedded_metadata():
+    book = Book("path/to/book.pdf")
+    assert book.isbn_to_fetch(
+        {"title": "T", "author": "A", "isbn": "9780132350884"}
+        ) is None
+    assert book.isbn_to_fetch({"title": "T", "author": ""}) is None
+
+
+@patch("book_org.Book.lookup_isbn", return_value={"title": "Indexed"})
+@patch("book_org.Book.fetch_metadata_by_isbn")
+@patch("book_org.Book.log")
+def test_find_metadata_prefers_offline_index(
+    mock_log, mock_fetch_by_isbn, mock_lookup
+):
+    book = Book("path/to/Mobi Book 9780132350884.mobi")
+    assert book.isbn_to_fetch({}) is None
+
+    book.find_metadata({})
+
+    mock_fetch_by_isbn.assert_not_called()
+    assert book.metadata == {"title": "Indexed"}
+
+
+@patch("book_org.Book.lookup_title_author", return_value={"title": "Dune"})
+@patch("book_org.Book.fetch_metadata_by_title_author")
+@patch("book_org.Book.log")
+def test_find_metadata_title_author_prefers_offline_index(
+    mock_log, mock_fetch, mock_lookup
+):
+    book = Book("path/to/Frank Herbert - Dune.mobi")
+    book.find_metadata({})
+
+    mock_fetch.assert_not_called()
+    mock_lookup.assert_called_once_with("Frank Herbert", "Dune")
+    assert book.metadata == {"title": "Dune"}
+
+
+@patch("book_org.Book.fetch_metadata_by_title_author")
+@patch("book_org.Book.log")
+def test_find_metadata_defers_ambiguous_lookup(mock_log, mock_fetch):
+    def fetch(author, title, candidates=None, **options):
+        candidates.append({"title": "Dune Road"})
+        return None
+    mock_fetch.side_effect = fetch
+
+    book = Book("Frank Herbert - Dune.epub", defer_review=True)
+    book.find_metadata({"title": "", "author": ""})
+
+    assert book.needs_review()
+    assert book.review_candidates == [{"title": "Dune Road"}]
+    assert not Book("Frank Herbert - Dune.epub").needs_review()
+
+
+@patch("book_org.Book.fetch_metadata_by_isbn", return_value=None)
+@patch("book_org.Book.log")
+def test_find_metadata_skips_open_library_after_batch_miss(
+    mock_log, mock_fetch_by_isbn
+):
+    book = Book("path/to/Mobi Book 9780132350884.mobi")
+    book.isbn_answered = True
+    book.find_metadata({})
+    mock_fetch_by_isbn.assert_called_once_with(
+        "9780132350884", skip=["Open Library"]
+        )
@@ -0,0 +1,72 @@
+# tests/test_breaker.py
+
+from unittest.mock import patch
+from book_org.breaker import CircuitBreaker
+
+
+def failing_breaker(**options):
+    breaker = CircuitBreaker("api.example", window=10, min_calls=3,
+                             error_rate=0.5, cooldown=30, **options)
+    with patch("book_org.breaker.log"):
+        for _ in range(3):
+            breaker.record(1.0, False)
+    return breaker
+
+
+def test_breaker_opens_once_enough_requests_fail():
+    breaker = CircuitBreaker("api.example", window=10, min_calls=3,
+                             error_rate=0.5)
+    for _ in range(4):
+        breaker.record(0.1, True)
+    breaker.record(0.1, False)
+    breaker.record(0.1, False)
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    with patch("book_org.breaker.log"):
+        breaker.record(0.1, False)
+    # 3 failures, but only 3 of 7 requests
+    assert breaker.state == "closed"
+    with patch("book_org.breaker.log"):
+        breaker.record(0.1, False)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+@patch("book_org.breaker.time.monotonic")
+def test_breaker_lets_one_trial_through_after_cooldown(mock_time):
+    mock_time.return_value = 100
+    breaker = failing_breaker()
+    mock_time.return_value = 129
+    assert not breaker.allow()
+
+    mock_time.return_value = 131
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # the trial is still in flight
+    with patch("book_org.breaker.log"):
+        breaker.record(0.2, True)
+    assert breaker.state == "closed"
+    assert breaker.error_rate() == 0.0
+
+
+@patch("book_org.breaker.time.monotonic")
+def test_failed_trial_opens_breaker_again(mock_time):
+    mock_time.return_value = 100
+    breaker = failing_breaker()
+    mock_time.return_value = 131
+    assert breaker.allow()
+    breaker.record(1.0, False)
+    assert breaker.state == "open"
+    mock_time.return_value = 160
+    assert not breaker.allow()
+    mock_time.return_value = 162
+    assert breaker.allow()
+
+
+def test_breaker_latency_is_the_median():
+    breaker = CircuitBreaker("api.example")
+    assert breaker.latency() == 0.0
+    for seconds in (0.1, 0.2, 9.0):
+        breaker.record(seconds, True)
+    assert breaker.latency() == 0.2
@@ -1,12 +1,17 @@
 # tests/test_cli.py
 
+import os
 import sys
+import pytest
 from unittest.mock import patch
 from book_org.cli import parse_args, main
+from book_org.config import MANIFEST_FILE, HTTP_CACHE_FILE
+from book_org.config import OFFLINE_INDEX_FILE, REVIEW_FILE, PREFETCH_BOOKS
 
 
+@patch("book_org.cli.configure_cache")
 @patch("book_org.cli.organize_dir")
-def test_main_calls_organize_dir(mock_organize):
+def test_main_calls_organize_dir(mock_organize, mock_cache):
     test_args = ["prog", "books", "-o", "organized", "-d", "-r", "-i"]
     with patch.object(sys, "argv", test_args):
         main()
@@ -15,7 +20,15 @@ def test_main_calls_organize_dir(mock_organize):
         "books",
         dry=True,
         interactive=True,
-        output_path_dir="organized"
+        output_path_dir="organized",
+        jobs=1,
+        procs=0,
+        manifest_path=None,
+        dedupe=None,
+        resume=False,
+        hedge_delay=None,
+        review_path=None,
+        prefetch=PREFETCH_BOOKS
     )
 
 
@@ -29,6 +42,18 @@ def test_parse_args_basic(monkeypatch):
     assert not args.dryrun
     assert not args.recursive
     assert not args.interactive
+    assert args.jobs == 1
+    assert args.procs == 0
+    assert args.manifest is None
+    assert args.dedupe is None
+    assert not args.resume
+    assert args.profile is None
+    assert not args.log_json
+    assert not args.refresh
+    assert not args.no_cache
+    assert args.hedge is None
+    assert args.index is None
+    assert not args.offline
 
 
 def test_parse_args_all_flags(monkeypatch):
@@ -41,3 +66,124 @@ def test_parse_args_all_flags(monkeypatch):
     assert args.dryrun
     assert args.recursive
     assert args.interactive
+
+
+def test_parse_args_jobs(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "-j", "8"])
+
+    args = parse_args()
+    assert args.jobs == 8
+
+
+def test_parse_args_procs_defaults_to_all_cores(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "-p"])
+
+    args = parse_args()
+    assert args.procs == os.cpu_count()
+
+
+def test_parse_args_manifest_default_path(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "-m"])
+
+    args = parse_args()
+    assert args.manifest == MANIFEST_FILE
+
+
+def test_parse_args_hedge(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "--hedge"])
+    assert parse_args().hedge == 0
+
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "--hedge", "0.5"])
+    assert parse_args().hedge == 0.5
+
+
+def test_parse_args_dedupe(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "--dedupe"])
+    assert parse_args().dedupe == "reuse"
+
+    monkeypatch.setattr(sys, "argv", ["prog", "source", "--dedupe", "move"])
+    assert parse_args().dedupe == "move"
+
+
+@patch("book_org.cli.configure_cache")
+@patch("book_org.cli.profiler")
+@patch("book_org.cli.organize_dir")
+def test_main_profile_reports_after_run(
+    mock_organize, mock_profiler, mock_cache
+):
+    with patch.object(sys, "argv", ["prog", "books", "--profile", "p.json"]):
+        main()
+
+    mock_profiler.enable.assert_called_once()
+    mock_profiler.report.assert_called_once_with("p.json")
+
+
+@patch("book_org.cli.configure_cache")
+@patch("book_org.cli.organize_dir")
+def test_main_uses_http_cache(mock_organize, mock_cache):
+    with patch.object(sys, "argv", ["prog", "books", "--refresh"]):
+        main()
+    mock_cache.assert_called_once_with(HTTP_CACHE_FILE, refresh=True)
+
+    mock_cache.reset_mock()
+    with patch.object(sys, "argv", ["prog", "books", "--no-cache"]):
+        main()
+    mock_cache.assert_not_called()
+
+
+@patch("book_org.cli.build_index", return_value=3)
+def test_main_index_command(mock_build):
+    argv = ["prog", "index", "editions.txt.gz", "-a", "authors.txt.gz"]
+    with patch.object(sys, "argv", argv):
+        main()
+    mock_build.assert_called_once_with(
+        OFFLINE_INDEX_FILE, "editions.txt.gz", "authors.txt.gz"
+        )
+
+
+@patch("book_org.cli.os.path.exists", return_value=True)
+@patch("book_org.cli.set_offline")
+@patch("book_org.cli.open_index")
+@patch("book_org.cli.configure_cache")
+@patch("book_org.cli.organize_dir")
+def test_main_offline_with_index(
+    mock_organize, mock_cache, mock_open_index, mock_offline, mock_exists
+):
+    argv = ["prog", "books", "--index", "--offline"]
+    with patch.object(sys, "argv", argv):
+        main()
+    mock_open_index.assert_called_once_with(OFFLINE_INDEX_FILE)
+    mock_offline.assert_called_once()
+
+
+@patch("book_org.cli.log")
+@patch("book_org.cli.open_index")
+@patch("book_org.cli.organize_dir")
+def test_main_missing_index_exits(
+    mock_organize, mock_open_index, mock_log, tmp_path
+):
+    argv = ["prog", "books", "--index", str(tmp_path / "missing.sqlite")]
+    with patch.object(sys, "argv", argv), pytest.raises(SystemExit):
+        main()
+    assert mock_log.call_args.args[0] == "[ERROR]"
+    mock_open_index.assert_not_called()
+    mock_organize.assert_not_called()
+
+
+@patch("book_org.cli.review_books")
+def test_main_review_command(mock_review, tmp_path):
+    queue_path = str(tmp_path / "review.sqlite")
+    with patch.object(sys, "argv", ["prog", "review", queue_path, "-d"]):
+        main()
+    mock_review.assert_not_called()  # nothing was deferred yet
+
+    with patch("book_org.cli.configure_cache"), \
+            patch("book_org.cli.organize_dir") as mock_organize, \
+            patch.object(sys, "argv", ["prog", "books", "--defer"]):
+        main()
+    assert mock_organize.call_args.kwargs["review_path"] == REVIEW_FILE
+
+    open(queue_path, "w").close()
+    with patch.object(sys, "argv", ["prog", "review", queue_path, "-d"]):
+        main()
+    assert mock_review.call_args.kwargs == {"dry": True}
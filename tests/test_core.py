@@ -1,9 +1,31 @@
 # tests/test_core.py
 
+import pytest
 from unittest.mock import patch, MagicMock
 from book_org import core
 
 
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    # organize_dir writes its journal to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def fake_book(**kwargs):
+    kwargs.setdefault("fullpath", "book.epub")
+    book = MagicMock(organized=False, **kwargs)
+    book.to_record.return_value = {}
+    book.isbn_to_fetch.return_value = None
+    book.needs_review.return_value = False
+    return book
+
+
+def run_stage(stage, book):
+    if stage.batch_size > 1:
+        return stage.func([book])[0]
+    return stage.func(book)
+
+
 def test_is_ext_valid_accepts_valid_extensions():
     for ext in core.valid_file_extensions:
         assert core.is_ext_valid(ext) is True
@@ -35,24 +57,26 @@ def test_find_all_files_filters_extensions(tmp_path):
     assert str(invalid_file) not in files
 
 
+@patch("book_org.core.extract_metadata_safe", return_value={})
 @patch("book_org.core.Book")
 @patch("book_org.core.move_book")
-@patch("book_org.core.progress_bar")
-@patch("book_org.core.find_all_files")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.iter_all_files")
 @patch("os.path.isfile")
 def test_organize_dir_directory_mode(
     mock_isfile,
-    mock_find_all,
+    mock_iter_files,
     mock_progress,
     mock_move,
     mock_book_class,
+    mock_extract,
 ):
     # Return False for directory ("test_dir"), True for files
     mock_isfile.side_effect = lambda path: path != "test_dir"
-    mock_find_all.return_value = ["book1.epub", "book2.epub"]
+    mock_iter_files.return_value = ["book1.epub", "book2.epub"]
 
-    mock_book = MagicMock()
-    mock_book_class.return_value = mock_book
+    book = fake_book()
+    mock_book_class.return_value = book
 
     core.organize_dir(
         "test_dir",
@@ -63,12 +87,13 @@ def test_organize_dir_directory_mode(
 
     # Book should be instantiated once per file found
     assert mock_book_class.call_count == 2
-    # organize_book should be called on the mock Book instance for each file
-    assert mock_book.organize_book.call_count == 2
+    # every file should go through the fetch and categorize stages
+    assert book.find_metadata.call_count == 2
+    assert book.categorize.call_count == 2
     # move_book should be called for each file (with dry=True)
     assert mock_move.call_count == 2
-    # progress_bar should be called twice: after each file
-    assert mock_progress.call_count == 2
+    # the progress display should be updated after each file
+    assert mock_progress.return_value.update.call_count == 2
 
 
 @patch("book_org.core.Book")
@@ -85,6 +110,7 @@ def test_organize_dir_single_file_mode(mock_isfile, mock_book_class):
         "book.epub",
         interactive_organizer=False,
         output_path_dir=None,
+        hedge_delay=None,
     )
     mock_book.organize_book.assert_called_once()
 
@@ -97,3 +123,389 @@ def test_standardize_categories_stub():
     books = [DummyBook(["sci-fi"]), DummyBook(["SciFi"])]
     # Currently does nothing, but it should not crash
     core.standardize_categories(books)
+
+
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.core.Book")
+@patch("book_org.core.move_book")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.iter_all_files")
+@patch("os.path.isfile")
+def test_organize_dir_jobs_moves_in_discovery_order(
+    mock_isfile,
+    mock_iter_files,
+    mock_progress,
+    mock_move,
+    mock_book_class,
+    mock_extract,
+):
+    mock_isfile.side_effect = lambda path: path != "test_dir"
+    files = [f"book{n}.epub" for n in range(20)]
+    mock_iter_files.return_value = files
+    mock_book_class.side_effect = lambda path, **kwargs: fake_book(
+        fullpath=path
+        )
+
+    core.organize_dir("test_dir", jobs=4)
+
+    moved = [call.args[0].fullpath for call in mock_move.call_args_list]
+    assert moved == files
+    assert mock_progress.return_value.update.call_count == len(files)
+
+
+@patch("book_org.core.Pipeline")
+@patch("book_org.core.Book")
+@patch("book_org.core.move_book")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.iter_all_files", return_value=["book.epub"])
+@patch("os.path.isfile")
+def test_organize_dir_interactive_ignores_jobs(
+    mock_isfile,
+    mock_iter_files,
+    mock_progress,
+    mock_move,
+    mock_book_class,
+    mock_pipeline,
+):
+    mock_isfile.side_effect = lambda path: path != "test_dir"
+
+    core.organize_dir("test_dir", interactive=True, jobs=4, prefetch=0)
+
+    stages = mock_pipeline.call_args.args[0]
+    assert [stage.workers for stage in stages if stage.name == "fetch"] \
+        == [1]
+    assert "select" not in [stage.name for stage in stages]
+
+    core.organize_dir("test_dir", interactive=True, jobs=1, prefetch=3)
+
+    stages = {stage.name: stage for stage in mock_pipeline.call_args.args[0]}
+    assert stages["fetch"].workers == 3
+    assert stages["select"].workers == 1
+
+
+@patch("book_org.core.Book")
+@patch("book_org.core.move_book")
+@patch("book_org.core.ProgressDisplay")
+def test_organize_dir_procs_feeds_extracted_metadata(
+    mock_progress,
+    mock_move,
+    mock_book_class,
+    tmp_path,
+):
+    import fitz
+
+    pdf_path = tmp_path / "book.pdf"
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "ISBN 978-0-13-235088-4")
+        doc.set_metadata({"title": "Clean Code", "author": "Robert Martin"})
+        doc.save(str(pdf_path))
+
+    book = fake_book(fullpath=str(pdf_path))
+    mock_book_class.return_value = book
+
+    core.organize_dir(str(tmp_path), jobs=2, procs=2)
+
+    embedded_meta = book.find_metadata.call_args.args[0]
+    assert embedded_meta["title"] == "Clean Code"
+    assert embedded_meta["isbn"] == "9780132350884"
+    mock_move.assert_called_once_with(book, False)
+
+
+def test_iter_all_files_is_lazy_and_recursive(tmp_path):
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    (tmp_path / "top.pdf").write_text("dummy")
+    (nested / "deep.epub").write_text("dummy")
+    (nested / "skip.mp3").write_text("dummy")
+
+    files = core.iter_all_files(str(tmp_path))
+
+    assert not isinstance(files, list)
+    assert sorted(files) == sorted([
+        str(tmp_path / "top.pdf"),
+        str(nested / "deep.epub"),
+        ])
+
+
+def test_iter_all_files_skips_symlinked_directories(tmp_path):
+    (tmp_path / "real.pdf").mkdir()
+    (tmp_path / "book.pdf").write_text("dummy")
+    (tmp_path / "link.pdf").symlink_to(tmp_path / "real.pdf")
+    (tmp_path / "alias.epub").symlink_to(tmp_path / "book.pdf")
+
+    assert sorted(core.iter_all_files(str(tmp_path))) == sorted([
+        str(tmp_path / "alias.epub"),
+        str(tmp_path / "book.pdf"),
+        ])
+
+
+def test_file_discovery_keeps_running_total(tmp_path):
+    for n in range(3):
+        (tmp_path / f"book{n}.pdf").write_text("dummy")
+
+    discovery = core.FileDiscovery(str(tmp_path), buffer_size=1)
+    files = list(discovery)
+
+    assert len(files) == 3
+    assert discovery.found == 3
+    assert discovery.done
+
+
+@patch("book_org.core.log")
+@patch("book_org.core.extract_metadata_safe")
+def test_manifest_record_skips_every_stage(mock_extract, mock_log):
+    manifest = MagicMock()
+    manifest.lookup.return_value = {
+        "metadata": {"title": "Book"},
+        "categories": ["art"],
+        "new_filename": "Book.pdf",
+    }
+
+    book = core.open_book("intake/book.pdf", manifest=manifest)
+    with patch.object(book, "find_metadata") as mock_find:
+        for stage in core.build_pipeline().stages:
+            book = run_stage(stage, book)
+
+    assert book.in_manifest
+    assert book.new_fullpath == "organized_books/art/Book.pdf"
+    mock_extract.assert_not_called()
+    mock_find.assert_not_called()
+    manifest.store.assert_not_called()
+
+
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.Book.fetch_metadata_by_title_author")
+def test_manifest_recognizes_books_moved_by_previous_run(
+    mock_fetch, mock_extract, mock_progress, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    mock_fetch.return_value = {
+        "title": "Dune", "authors": ["Frank Herbert"], "published": "1965",
+        "isbn": "9780441172719", "categories": ["fiction"],
+        }
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    (intake / "Frank Herbert - Dune.epub").write_text("dummy")
+    output = str(tmp_path / "organized")
+    manifest = str(tmp_path / "manifest.sqlite")
+
+    core.organize_dir(str(intake), output_path_dir=output,
+                      manifest_path=manifest)
+    moved = tmp_path / "organized" / "fiction" / \
+        "Frank Herbert - Dune (1965) [9780441172719].epub"
+    assert moved.exists()
+
+    # The next run over the output finds the book in the manifest
+    core.organize_dir(output, output_path_dir=output, manifest_path=manifest)
+    assert moved.exists()
+    mock_fetch.assert_called_once()
+
+
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.move_book", side_effect=OSError("disk full"))
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.Book.fetch_metadata_by_title_author", return_value=None)
+def test_failed_move_is_not_stored_in_manifest(
+    mock_fetch, mock_extract, mock_move, mock_progress, tmp_path,
+    monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    book_file = tmp_path / "intake" / "Frank Herbert - Dune.epub"
+    book_file.parent.mkdir()
+    book_file.write_text("dummy")
+    manifest_path = str(tmp_path / "manifest.sqlite")
+
+    with pytest.raises(OSError):
+        core.organize_dir(str(book_file.parent), manifest_path=manifest_path)
+
+    manifest = core.Manifest(manifest_path)
+    assert manifest.lookup(str(book_file)) is None
+    manifest.close()
+
+
+def test_organize_duplicate_reuses_representative_record():
+    record = {
+        "metadata": {"title": "Book"},
+        "categories": ["science"],
+        "new_filename": "Author - Book.pdf",
+    }
+    book = core.organize_duplicate(
+        "intake/copy.pdf", record, copy_number=2, output_path_dir="out"
+        )
+    assert book.metadata == {"title": "Book"}
+    assert book.new_fullpath == "out/science/Author - Book (2).pdf"
+
+
+def test_organize_duplicate_move_mode():
+    book = core.organize_duplicate(
+        "intake/copy.pdf", {"categories": ["science"]}, mode="move",
+        output_path_dir="out"
+        )
+    assert book.new_fullpath == "out/duplicates/copy.pdf"
+
+
+@patch("book_org.core.log")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.move_book")
+@patch("book_org.core.Book.find_metadata", autospec=True)
+def test_organize_dir_dedupe_fetches_one_copy(
+    mock_find_metadata, mock_move, mock_progress, mock_log, tmp_path
+):
+    for name in ["a.pdf", "b.pdf", "c.pdf"]:
+        (tmp_path / name).write_bytes(b"same book")
+    (tmp_path / "other.pdf").write_bytes(b"another book")
+
+    def find_metadata(book, embedded_meta=None):
+        book.metadata = {
+            "title": f"resolved {book.filename}",
+            "categories": ["science"],
+            "isbn": "",
+            }
+    mock_find_metadata.side_effect = find_metadata
+
+    core.organize_dir(str(tmp_path), output_path_dir="out", dedupe="reuse")
+
+    assert mock_find_metadata.call_count == 2
+    moved = [call.args[0].new_fullpath for call in mock_move.call_args_list]
+    representative = moved[0] if "other" not in moved[0] else moved[1]
+    name = representative.rsplit(".pdf", 1)[0]
+    assert f"{name} (1).pdf" in moved
+    assert f"{name} (2).pdf" in moved
+    assert len(moved) == 4
+
+
+@patch("book_org.core.log")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.move_book")
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.core.Book.find_metadata", autospec=True)
+def test_organize_dir_resume_skips_completed_work(
+    mock_find_metadata, mock_extract, mock_move, mock_progress, mock_log,
+    tmp_path
+):
+    library = tmp_path / "library"
+    library.mkdir()
+    for name in ["moved.pdf", "organized.pdf", "new.pdf"]:
+        (library / name).write_text(name)
+
+    journal = core.Journal(core.JOURNAL_FILE)
+    journal.record_moved(MagicMock(fullpath=str(library / "moved.pdf")))
+    organized = MagicMock(fullpath=str(library / "organized.pdf"))
+    organized.to_record.return_value = {
+        "metadata": {"title": "Organized"},
+        "categories": ["art"],
+        "new_filename": "Organized.pdf",
+    }
+    journal.record_organized(organized)
+    journal.close()
+
+    core.organize_dir(str(library), resume=True)
+
+    fetched = [call.args[0].filename for call in mock_find_metadata.mock_calls]
+    assert fetched == ["new.pdf"]
+    moved = sorted(call.args[0].filename for call in mock_move.call_args_list)
+    assert moved == ["new.pdf", "organized.pdf"]
+    assert not (tmp_path / core.JOURNAL_FILE).exists()
+
+
+@patch("book_org.core.fetch_metadata_by_isbns")
+def test_isbn_stage_resolves_batch_in_one_lookup(mock_lookup):
+    mock_lookup.return_value = {"111": {"title": "Found"}, "222": None}
+    found, missed, failed, done = [fake_book() for _ in range(4)]
+    done.organized = True
+    found.isbn_to_fetch.return_value = "111"
+    missed.isbn_to_fetch.return_value = "222"
+    failed.isbn_to_fetch.return_value = "333"
+
+    books = [found, missed, failed, done]
+    assert core.isbn_stage(books) == books
+
+    mock_lookup.assert_called_once_with(["111", "222", "333"])
+    assert found.isbn_metadata == {"title": "Found"}
+    assert missed.isbn_metadata is None and missed.isbn_answered
+    assert failed.isbn_metadata is None and not failed.isbn_answered
+    done.isbn_to_fetch.assert_not_called()
+
+
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.core.Book")
+@patch("book_org.core.move_book")
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.iter_all_files")
+@patch("os.path.isfile")
+def test_organize_dir_defers_ambiguous_books(
+    mock_isfile,
+    mock_iter_files,
+    mock_progress,
+    mock_move,
+    mock_book_class,
+    mock_extract,
+    tmp_path,
+):
+    mock_isfile.side_effect = lambda path: path != "test_dir"
+    mock_iter_files.return_value = ["sure.epub", "unsure.epub"]
+    books = {}
+
+    def make_book(path, **kwargs):
+        book = books[path] = fake_book(fullpath=path)
+        book.needs_review.return_value = path == "unsure.epub"
+        book.output_path_dir = "organized"
+        book.review_candidates = [{"title": "Maybe"}]
+        assert kwargs["defer_review"]
+        return book
+    mock_book_class.side_effect = make_book
+
+    queue_path = str(tmp_path / "review.sqlite")
+    core.organize_dir("test_dir", interactive=True, jobs=4,
+                      review_path=queue_path)
+
+    mock_move.assert_called_once_with(books["sure.epub"], False)
+    books["unsure.epub"].categorize.assert_not_called()
+    queue = core.ReviewQueue(queue_path)
+    assert queue.pending() == [("unsure.epub", "organized",
+                                [{"title": "Maybe"}])]
+    queue.close()
+
+
+@patch("book_org.core.can_display_images", return_value=True)
+@patch("book_org.core.warm_thumbnails")
+@patch("book_org.core.prompt_selection")
+def test_select_stage_prompts_for_prefetched_candidates(
+    mock_prompt, mock_warm, mock_display_images
+):
+    candidates = [{"title": "Dune", "image_url": "http://covers/1.jpg"}]
+    book = fake_book(review_candidates=candidates, metadata=None)
+    book.needs_review.return_value = True
+    mock_prompt.return_value = candidates[0]
+    stages = {
+        stage.name: stage for stage in core.build_pipeline(select=True).stages
+        }
+
+    run_stage(stages["fetch"], book)
+    book.find_metadata.assert_called_once()
+    mock_warm.assert_called_once_with(candidates)
+
+    run_stage(stages["select"], book)
+    mock_prompt.assert_called_once_with(candidates)
+    assert book.metadata == candidates[0]
+    assert book.review_candidates == []
+
+
+@patch("book_org.core.ProgressDisplay")
+@patch("book_org.core.move_book")
+@patch("book_org.core.extract_metadata_safe", return_value={})
+@patch("book_org.core.Book.find_metadata", autospec=True)
+def test_dry_run_keeps_no_journal(
+    mock_find_metadata, mock_extract, mock_move, mock_progress, tmp_path,
+    monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    library = tmp_path / "library"
+    library.mkdir()
+    (library / "book.pdf").write_text("book")
+
+    with patch("book_org.core.Journal.close") as mock_close:
+        core.organize_dir(str(library), dry=True)
+    mock_close.assert_called_once()
+    assert not (tmp_path / core.JOURNAL_FILE).exists()
@@ -0,0 +1,58 @@
+# tests/test_dedupe.py
+
+from unittest.mock import patch
+from book_org import dedupe
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_hash_file_partial_only_reads_prefix(tmp_path):
+    a = write(tmp_path / "a.pdf", b"x" * 10 + b"tail a")
+    b = write(tmp_path / "b.pdf", b"x" * 10 + b"tail b")
+    assert dedupe.hash_file(a, 10) == dedupe.hash_file(b, 10)
+    assert dedupe.hash_file(a) != dedupe.hash_file(b)
+
+
+def test_find_duplicates_groups_identical_files(tmp_path):
+    original = write(tmp_path / "original.pdf", b"same book")
+    copy = write(tmp_path / "copy.pdf", b"same book")
+    other = write(tmp_path / "other.pdf", b"different")
+
+    duplicates = dedupe.find_duplicates([original, copy, other])
+
+    assert duplicates == {copy: original}
+
+
+def test_find_duplicates_same_size_different_content(tmp_path):
+    a = write(tmp_path / "a.pdf", b"aaaa")
+    b = write(tmp_path / "b.pdf", b"bbbb")
+    assert dedupe.find_duplicates([a, b]) == {}
+
+
+def test_find_duplicates_full_hash_only_on_collisions(tmp_path):
+    prefix = b"p" * dedupe.PARTIAL_HASH_SIZE
+    a = write(tmp_path / "a.pdf", prefix + b"end a")
+    b = write(tmp_path / "b.pdf", prefix + b"end b")
+    c = write(tmp_path / "c.pdf", prefix + b"end a")
+    unique = write(tmp_path / "unique.pdf", b"no size collision")
+
+    with patch(
+        "book_org.dedupe.hash_file", wraps=dedupe.hash_file
+            ) as mock_hash:
+        duplicates = dedupe.find_duplicates([a, b, c, unique])
+
+    assert duplicates == {c: a}
+    hashed = [call.args[0] for call in mock_hash.call_args_list]
+    assert unique not in hashed
+    full_hashes = [
+        call for call in mock_hash.call_args_list if len(call.args) == 1
+        ]
+    assert len(full_hashes) == 3
+
+
+def test_find_duplicates_skips_unreadable_files(tmp_path):
+    a = write(tmp_path / "a.pdf", b"book")
+    assert dedupe.find_duplicates([a, str(tmp_path / "gone.pdf")]) == {}
@@ -6,7 +6,8 @@ from book_org.embedded_metadata import (
     extract_metadata,
     extract_pdf_metadata,
     extract_epub_metadata,
-    extract_isbn_from_text
+    extract_isbn_from_text,
+    extract_metadata_safe
 )
 
 
@@ -80,3 +81,11 @@ def test_extract_metadata_epub(mock_epub):
 def test_extract_metadata_unknown_format():
     result = extract_metadata("test.txt")
     assert result == {}
+
+
+@patch("book_org.embedded_metadata.log")
+@patch("book_org.embedded_metadata.extract_metadata")
+def test_extract_metadata_safe_swallows_errors(mock_extract, mock_log):
+    mock_extract.side_effect = RuntimeError("broken file")
+    assert extract_metadata_safe("broken.pdf") == {}
+    mock_log.assert_called_once()
@@ -1,9 +1,65 @@
 # test_fetcher.py
 
+import json
+import re
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
 from unittest.mock import patch, MagicMock
 from book_org import fetcher
 
 
+class StubGoogleBooks(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.requests += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.clients.add(self.client_address)
+        time.sleep(server.latency)
+        # Searches get a volume that matches them, other queries one named
+        # after the request
+        query = parse_qs(urlsplit(self.path).query).get("q", [""])[0]
+        terms = dict(re.findall(r"(intitle|inauthor):([^+ ]+)", query))
+        body = json.dumps({"items": [{"volumeInfo": {
+            "title": terms.get("intitle", self.path),
+            "authors": [terms["inauthor"]] if "inauthor" in terms else [],
+            }}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGoogleBooks)
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = server.requests = 0
+    server.clients = set()
+    server.latency = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api = f"http://127.0.0.1:{server.server_port}/volumes?q="
+    with patch("book_org.fetcher.GOOGLE_BOOKS_API", api), \
+            patch("book_org.fetcher.log"):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
 def test_parse_metadata_basic():
     item = {
         "volumeInfo": {
@@ -55,7 +111,7 @@ def test_parse_metadata_missing_fields():
     assert metadata["image_url"] is None
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_success(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -71,7 +127,7 @@ def test_fetch_metadata_by_isbn_success(mock_get):
     assert result["title"] == "Book Title"
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_no_items(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -81,7 +137,7 @@ def test_fetch_metadata_by_isbn_no_items(mock_get):
     assert result is None
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_bad_status(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 404
@@ -90,7 +146,25 @@ def test_fetch_metadata_by_isbn_bad_status(mock_get):
     assert result is None
 
 
-@patch('book_org.fetcher.requests.get')
+@pytest.mark.parametrize("body", [ValueError("Expecting value"), []])
+@patch('book_org.fetcher.log')
+@patch('book_org.fetcher.http_get')
+def test_fetch_metadata_by_isbn_survives_unreadable_body(
+    mock_get, mock_log, body, response_cache
+):
+    # e.g. the HTML page of a captive portal
+    response = MagicMock(status_code=200)
+    if isinstance(body, Exception):
+        response.json.side_effect = body
+    else:
+        response.json.return_value = body
+    mock_get.return_value = response
+    assert fetcher.fetch_metadata_by_isbn("1234567890") is None
+    assert fetcher.fetch_metadata_by_isbn("1234567890") is None
+    assert mock_get.call_count == 2  # not remembered as a miss
+
+
+@patch('book_org.fetcher.http_get')
 def test_fetch_google_books_success(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -106,7 +180,7 @@ def test_fetch_google_books_success(mock_get):
     assert result["title"] == "Some Book"
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_google_books_no_items(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -116,7 +190,7 @@ def test_fetch_google_books_no_items(mock_get):
     assert result is None
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_google_books_exception(mock_get):
     mock_get.side_effect = Exception("Network error")
     result = fetcher.fetch_google_books("intitle:test")
@@ -159,36 +233,573 @@ def test_fetch_metadata_by_title_author_interactive(
     mock_print.assert_called_once()
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_openlib_success(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = {
-        "items": [{"volumeInfo": {"title": "OpenLib Book"}}]
+        "ISBN:1234567890": {"title": "OpenLib Book"}
     }
     mock_get.return_value = mock_response
     with patch(
-        'book_org.fetcher.parse_metadata',
+        'book_org.fetcher.parse_openlib_metadata',
         return_value={"title": "OpenLib Book"}
             ):
         result = fetcher.fetch_metadata_by_isbn_openlib("1234567890")
     assert result["title"] == "OpenLib Book"
+    mock_get.assert_called_once_with(
+        f"{fetcher.OPEN_LIBRARY_API}ISBN:1234567890"
+        )
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_openlib_no_items(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"items": None}
+    mock_response.json.return_value = {}
     mock_get.return_value = mock_response
     result = fetcher.fetch_metadata_by_isbn_openlib("1234567890")
     assert result is None
 
 
-@patch('book_org.fetcher.requests.get')
+@patch('book_org.fetcher.http_get')
 def test_fetch_metadata_by_isbn_openlib_bad_status(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 404
     mock_get.return_value = mock_response
     result = fetcher.fetch_metadata_by_isbn_openlib("1234567890")
     assert result is None
+
+
+def test_parse_openlib_metadata():
+    record = {
+        "title": "Dune",
+        "authors": [{"name": "Frank Herbert", "url": "https://..."}],
+        "publish_date": "August 1965",
+        "publishers": [{"name": "Chilton Books"}],
+        "identifiers": {"isbn_10": ["0441172717"]},
+        "subjects": [{"name": "Science Fiction"}, {"name": "Arrakis"}],
+        "cover": {"small": "http://s", "medium": "http://m"},
+    }
+    assert fetcher.parse_openlib_metadata(record, "9780441172719") == {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "published": "1965",
+        "isbn": "0441172717",
+        "publisher": "Chilton Books",
+        "categories": ["science fiction", "arrakis"],
+        "image_url": "http://m",
+    }
+    assert fetcher.parse_openlib_metadata({}, "9780441172719") == {
+        "title": None,
+        "authors": [],
+        "published": "",
+        "isbn": "9780441172719",
+        "publisher": "",
+        "categories": [],
+        "image_url": None,
+    }
+
+
+@patch('book_org.fetcher.ISBN_BATCH_SIZE', 2)
+@patch('book_org.fetcher.http_get')
+def test_fetch_metadata_by_isbns_batches_requests(mock_get):
+    def answer(url):
+        bibkeys = url[len(fetcher.OPEN_LIBRARY_API):].split(",")
+        response = MagicMock(status_code=200)
+        response.json.return_value = {
+            key: {"title": key} for key in bibkeys if key != "ISBN:333"
+            }
+        return response
+    mock_get.side_effect = answer
+
+    found = fetcher.fetch_metadata_by_isbns(["111", "1-1-1", "222", "333"])
+
+    assert mock_get.call_count == 2
+    assert found["111"]["title"] == "ISBN:111"
+    assert found["1-1-1"]["title"] == "ISBN:111"
+    assert found["222"]["isbn"] == "222"
+    assert found["333"] is None
+
+
+@patch('book_org.fetcher.http_get')
+def test_fetch_metadata_by_isbns_caches_each_isbn(mock_get, response_cache):
+    def answer(url):
+        bibkeys = url[len(fetcher.OPEN_LIBRARY_API):].split(",")
+        response = MagicMock(status_code=200)
+        response.json.return_value = {key: {"title": key} for key in bibkeys}
+        return response
+    mock_get.side_effect = answer
+
+    fetcher.fetch_metadata_by_isbns(["111", "222"])
+    # Batched differently, as a later run would
+    assert fetcher.fetch_metadata_by_isbns(["222", "111"])["111"] == \
+        fetcher.parse_openlib_metadata({"title": "ISBN:111"}, "111")
+    assert fetcher.fetch_metadata_by_isbns(["111"])["111"]["isbn"] == "111"
+    found = fetcher.fetch_metadata_by_isbns(["222", "333"])
+
+    assert found["222"]["title"] == "ISBN:222"
+    assert found["333"]["title"] == "ISBN:333"
+    assert [call.args[0] for call in mock_get.call_args_list] == [
+        fetcher.OPEN_LIBRARY_API + "ISBN:111,ISBN:222",
+        fetcher.OPEN_LIBRARY_API + "ISBN:333",
+        ]
+
+
+@patch('book_org.fetcher.http_get', side_effect=Exception("Network error"))
+def test_fetch_metadata_by_isbns_survives_failed_batch(mock_get):
+    assert fetcher.fetch_metadata_by_isbns(["111", "222"]) == {}
+
+
+def test_http_get_reuses_pooled_connection(stub_server):
+    for _ in range(3):
+        assert fetcher.fetch_google_books("intitle:test") is not None
+    assert len(stub_server.clients) == 1
+
+
+def test_http_get_caps_requests_per_host(stub_server):
+    stub_server.latency = 0.05
+
+    with patch("book_org.fetcher.MAX_CONNECTIONS_PER_HOST", 3), \
+            patch("book_org.fetcher._session", None), \
+            ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(
+            fetcher.fetch_metadata_by_isbn, [str(n) for n in range(12)]
+            ))
+
+    assert all(results)
+    assert stub_server.max_in_flight <= 3
+
+
+def test_http_get_serves_repeated_queries_from_cache(stub_server, tmp_path):
+    fetcher.configure_cache(str(tmp_path / "cache.sqlite"))
+    try:
+        first = fetcher.fetch_google_books("intitle:Dune")
+        again = fetcher.fetch_google_books("intitle:dune")
+        assert stub_server.requests == 1
+        assert again == first
+
+        fetcher.configure_cache(str(tmp_path / "cache.sqlite"), refresh=True)
+        fetcher.fetch_google_books("intitle:Dune")
+        assert stub_server.requests == 2
+    finally:
+        fetcher.close_cache()
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    fetcher.configure_cache(str(tmp_path / "cache.sqlite"))
+    yield
+    fetcher.close_cache()
+
+
+@patch('book_org.fetcher.fetch_google_books', return_value=None)
+def test_title_author_miss_is_not_looked_up_again(mock_fetch, response_cache):
+    assert fetcher.fetch_metadata_by_title_author("Ann Author", "Title") \
+        is None
+    assert mock_fetch.call_count == 4
+
+    assert fetcher.fetch_metadata_by_title_author(
+        "ann  author", "TITLE!"
+        ) is None
+    assert mock_fetch.call_count == 4
+
+
+@patch('book_org.fetcher.http_get', side_effect=Exception("Network error"))
+def test_failed_title_author_lookup_is_not_a_miss(mock_get, response_cache):
+    fetcher.fetch_metadata_by_title_author("Author", "Title")
+    fetcher.fetch_metadata_by_title_author("Author", "Title")
+    assert mock_get.call_count == 8
+
+
+@patch('book_org.fetcher.http_get')
+def test_isbn_miss_is_not_looked_up_again(mock_get, response_cache):
+    mock_get.return_value = MagicMock(status_code=200)
+    mock_get.return_value.json.return_value = {"totalItems": 0}
+
+    assert fetcher.fetch_metadata_by_isbn("978-0-00-000000-2") is None
+    assert fetcher.fetch_metadata_by_isbn("9780000000002") is None
+    assert mock_get.call_count == 1
+
+
+def http_response(status_code, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = {
+        "items": [{"volumeInfo": {"title": "Book"}}]
+        }
+    return response
+
+
+@patch('book_org.fetcher.API_RATE_LIMITS', {})
+@patch('book_org.fetcher.time.sleep')
+@patch('book_org.fetcher.get_session')
+def test_http_get_retries_rate_limited_requests(mock_session, mock_sleep):
+    mock_session.return_value.get.side_effect = [
+        http_response(429, {"Retry-After": "2"}),
+        http_response(503),
+        http_response(200),
+        ]
+    assert fetcher.fetch_google_books("intitle:test") == \
+        fetcher.parse_metadata({"volumeInfo": {"title": "Book"}})
+    assert mock_session.return_value.get.call_count == 3
+    assert mock_sleep.call_args_list[0].args == (2.0,)
+
+
+@patch('book_org.fetcher.time.sleep')
+@patch('book_org.fetcher.get_session')
+def test_http_get_gives_up_after_retries(mock_session, mock_sleep):
+    mock_session.return_value.get.side_effect = \
+        fetcher.requests.ConnectionError("refused")
+    with pytest.raises(fetcher.requests.ConnectionError):
+        fetcher.http_get("http://example.invalid/")
+    assert mock_session.return_value.get.call_count == \
+        fetcher.HTTP_RETRIES + 1
+
+
+@patch('book_org.fetcher.time.sleep')
+@patch('book_org.fetcher.get_session')
+def test_http_get_does_not_wait_out_long_retry_after(
+    mock_session, mock_sleep
+):
+    mock_session.return_value.get.return_value = \
+        http_response(429, {"Retry-After": "86400"})
+    assert fetcher.http_get("http://example.invalid/").status_code == 429
+    mock_sleep.assert_not_called()
+
+
+@patch('book_org.fetcher.http_get', return_value=http_response(429))
+def test_rate_limited_title_author_lookup_is_not_a_miss(
+    mock_get, response_cache
+):
+    fetcher.fetch_metadata_by_title_author("Author", "Title")
+    fetcher.fetch_metadata_by_title_author("Author", "Title")
+    assert mock_get.call_count == 8
+
+
+def test_concurrent_identical_queries_share_one_request(stub_server):
+    stub_server.latency = 0.2
+    queries = ["intitle:Dune", "intitle:dune", "intitle:DUNE  "] * 3
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(fetcher.fetch_google_books, queries))
+
+    assert stub_server.requests == 1
+    assert all(result == results[0] for result in results)
+
+
+@patch('book_org.fetcher.http_get')
+def test_fetch_metadata_by_isbn_normalizes_isbn(mock_get):
+    mock_get.return_value = MagicMock(status_code=404)
+    fetcher.fetch_metadata_by_isbn("0-8044-2957-x")
+    mock_get.assert_called_once_with(
+        fetcher.google_books_url("isbn:080442957X", max_results=1)
+        )
+
+
+def timed_search(answers):
+    """fetch_google_books stand-in: query -> (seconds, metadata)."""
+    sent = []
+
+    def fake_fetch(query, expected=None):
+        sent.append(query)
+        delay, metadata = answers[query]
+        time.sleep(delay)
+        return metadata
+    return fake_fetch, sent
+
+
+def volume(publisher):
+    return {"title": "Title", "authors": ["Author"], "publisher": publisher}
+
+
+def test_hedged_search_returns_first_acceptable_strategy():
+    fake_fetch, sent = timed_search({
+        "intitle:Title+inauthor:Author": (0.2, volume("Normal")),
+        "intitle:Author+inauthor:Title": (0, volume("Reversed")),
+        "intitle:Title": (0, None),
+        "intitle:Author": (0, None),
+        })
+    with patch("book_org.fetcher.fetch_google_books", fake_fetch):
+        result = fetcher.fetch_metadata_by_title_author(
+            "Author", "Title", filename="Author - Title.pdf", hedge_delay=0
+            )
+    assert result == volume("Normal")
+    assert len(sent) == 4
+
+
+def test_hedged_search_does_not_wait_for_slow_misses():
+    fake_fetch, sent = timed_search({
+        "intitle:Title+inauthor:Author": (0.3, None),
+        "intitle:Author+inauthor:Title": (0.3, None),
+        "intitle:Title": (0, volume("Just title")),
+        "intitle:Author": (0.3, None),
+        })
+    start = time.monotonic()
+    with patch("book_org.fetcher.fetch_google_books", fake_fetch):
+        result = fetcher.fetch_metadata_by_title_author(
+            "Author", "Title", filename="Author - Title.pdf", hedge_delay=0
+            )
+    assert result == volume("Just title")
+    assert time.monotonic() - start < 0.6
+
+
+def test_hedge_delay_only_sends_more_queries_when_slow():
+    fake_fetch, sent = timed_search({
+        "intitle:Title+inauthor:Author": (0, volume("Normal")),
+        })
+    with patch("book_org.fetcher.fetch_google_books", fake_fetch):
+        result = fetcher.fetch_metadata_by_title_author(
+            "Author", "Title", filename="Author - Title.pdf", hedge_delay=1
+            )
+    assert result == volume("Normal")
+    assert sent == ["intitle:Title+inauthor:Author"]
+
+
+def test_google_books_url_asks_only_for_what_is_parsed():
+    url = fetcher.google_books_url("intitle:Dune")
+    assert url.startswith(fetcher.GOOGLE_BOOKS_API + "intitle:Dune&")
+    assert "&maxResults=10&" in url
+    fields = parse_qs(urlsplit(url).query)["fields"]
+    assert fields == [
+        "items(volumeInfo(title,authors,publishedDate,"
+        "industryIdentifiers,publisher,categories,imageLinks/thumbnail))"
+        ]
+    assert "(" not in url.split("&fields=")[1]
+
+
+def test_parse_metadata_only_reads_requested_fields():
+    volume_info = {
+        "title": "Dune",
+        "subtitle": "Deluxe Edition",
+        "authors": ["Frank Herbert"],
+        "publishedDate": "1965-08-01",
+        "industryIdentifiers": [
+            {"type": "ISBN_13", "identifier": "9780441172719"}
+            ],
+        "publisher": "Chilton",
+        "categories": ["Fiction"],
+        "description": "Set on the desert planet Arrakis...",
+        "pageCount": 412,
+        "imageLinks": {"thumbnail": "http://t", "small": "http://s"},
+    }
+    projected = {}
+    for field in fetcher.VOLUME_FIELDS:
+        name, _, subfield = field.partition("/")
+        if subfield:
+            projected[name] = {subfield: volume_info[name][subfield]}
+        else:
+            projected[name] = volume_info[name]
+
+    item = {"volumeInfo": volume_info, "saleInfo": {}, "accessInfo": {}}
+    assert fetcher.parse_metadata({"volumeInfo": projected}) == \
+        fetcher.parse_metadata(item)
+
+
+def test_offline_serves_only_cached_responses(stub_server, response_cache):
+    fetcher.fetch_google_books("intitle:Dune")
+    fetcher.set_offline()
+    try:
+        assert fetcher.fetch_google_books("intitle:Dune") is not None
+        assert fetcher.fetch_google_books("intitle:Emma") is None
+        assert fetcher.fetch_metadata_by_isbn("9780441172719") is None
+    finally:
+        fetcher.set_offline(False)
+    assert stub_server.requests == 1
+
+
+def google_books_response(*volumes):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "items": [{"volumeInfo": volume} for volume in volumes]
+        }
+    return response
+
+
+@patch('book_org.fetcher.http_get')
+def test_title_author_accepts_best_ranked_result_of_first_query(mock_get):
+    mock_get.return_value = google_books_response(
+        {"title": "Dune Messiah", "authors": ["Frank Herbert"]},
+        {"title": "Dune", "authors": ["Brian Herbert"],
+         "publishedDate": "2000"},
+        {"title": "Dune", "authors": ["Frank Herbert"],
+         "publishedDate": "1965"},
+        )
+    result = fetcher.fetch_metadata_by_title_author(
+        "Frank Herbert", "Dune", filename="Frank Herbert - Dune (1965).epub"
+        )
+    assert result["title"] == "Dune"
+    assert result["published"] == "1965"
+    assert mock_get.call_count == 1
+
+
+@patch('book_org.fetcher.http_get')
+def test_title_author_rejects_poor_matches(mock_get):
+    mock_get.return_value = google_books_response(
+        {"title": "Dune Road", "authors": ["Jim Bob"]}
+        )
+    assert fetcher.fetch_metadata_by_title_author(
+        "Frank Herbert", "Dune", filename="Frank Herbert - Dune.epub"
+        ) is None
+    assert mock_get.call_count == 4
+
+
+@patch('book_org.fetcher.get_session')
+def test_http_get_skips_host_with_open_circuit(mock_session):
+    breaker = fetcher.CircuitBreaker("example.invalid", min_calls=1)
+    with patch("book_org.breaker.log"):
+        breaker.record(1.0, False)
+    with patch.dict(fetcher._breakers, {"example.invalid": breaker}):
+        with pytest.raises(fetcher.CircuitOpenError):
+            fetcher.http_get("http://example.invalid/")
+    mock_session.return_value.get.assert_not_called()
+
+
+@patch('book_org.fetcher.get_session')
+def test_http_get_records_outcome_in_breaker(mock_session):
+    mock_session.return_value.get.return_value = http_response(200)
+    breaker = fetcher.CircuitBreaker("example.invalid")
+    with patch.dict(fetcher._breakers, {"example.invalid": breaker}):
+        fetcher.http_get("http://example.invalid/")
+        mock_session.return_value.get.return_value = \
+            http_response(429, {"Retry-After": "86400"})
+        fetcher.http_get("http://example.invalid/")
+    assert breaker.error_rate() == 0.5
+
+
+@patch('book_org.fetcher._host_bucket')
+@patch('book_org.fetcher.get_session')
+def test_breaker_latency_leaves_out_rate_limit_waits(
+    mock_session, mock_bucket
+):
+    mock_session.return_value.get.return_value = http_response(200)
+    mock_bucket.return_value.acquire.side_effect = lambda: time.sleep(0.2)
+    breaker = fetcher.CircuitBreaker("example.invalid")
+    with patch.dict(fetcher._breakers, {"example.invalid": breaker}):
+        fetcher.http_get("http://example.invalid/")
+    assert breaker.latency() < 0.1
+
+
+def test_parse_openlib_search_doc():
+    doc = {
+        "title": "Dune",
+        "author_name": ["Frank Herbert"],
+        "first_publish_year": 1965,
+        "isbn": ["9780441172719", "0441172717"],
+        "publisher": ["Ace Books"],
+        "subject": ["Science Fiction"],
+        "cover_i": 42,
+    }
+    assert fetcher.parse_openlib_search_doc(doc) == {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "published": "1965",
+        "isbn": "9780441172719",
+        "publisher": "Ace Books",
+        "categories": ["science fiction"],
+        "image_url": "https://covers.openlibrary.org/b/id/42-M.jpg",
+    }
+
+
+@patch('book_org.fetcher.http_get')
+def test_openlib_title_author_search_ranks_results(mock_get, response_cache):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"docs": [
+        {"title": "Dune Messiah", "author_name": ["Frank Herbert"]},
+        {"title": "Dune", "author_name": ["Frank Herbert"]},
+        ]}
+    mock_get.return_value = response
+    result = fetcher.fetch_metadata_by_title_author_openlib(
+        "Frank Herbert", "Dune"
+        )
+    assert result["title"] == "Dune"
+    url = mock_get.call_args.args[0]
+    assert url.startswith(fetcher.OPEN_LIBRARY_SEARCH_API)
+    assert "title=Dune" in url and "author=Frank+Herbert" in url
+
+    response.json.return_value = {"docs": []}
+    assert fetcher.fetch_metadata_by_title_author_openlib("A", "B") is None
+    assert fetcher.fetch_metadata_by_title_author_openlib("A", "B") is None
+    assert mock_get.call_count == 2
+
+
+@pytest.mark.parametrize("body", [ValueError("Expecting value"), []])
+@patch('book_org.fetcher.log')
+@patch('book_org.fetcher.http_get')
+def test_openlib_title_author_search_survives_unreadable_body(
+    mock_get, mock_log, body
+):
+    response = MagicMock(status_code=200)
+    if isinstance(body, Exception):
+        response.json.side_effect = body
+    else:
+        response.json.return_value = body
+    mock_get.return_value = response
+    assert fetcher.fetch_metadata_by_title_author_openlib(
+        "Frank Herbert", "Dune"
+        ) is None
+    assert mock_log.call_args.args[0] == "[WARN]"
+
+
+@patch('book_org.fetcher.fetch_google_books')
+@patch('builtins.input')
+def test_title_author_candidates_are_kept_instead_of_prompting(
+    mock_input, mock_fetch
+):
+    mock_fetch.side_effect = [{"title": "Title A"}, None, None, None]
+    candidates = []
+    assert fetcher.fetch_metadata_by_title_author(
+        "Author", "Title", interactive=True, candidates=candidates
+        ) is None
+    assert candidates == [{"title": "Title A"}]
+    mock_input.assert_not_called()
+
+
+def test_reversed_strategy_is_ranked_with_swapped_fields():
+    # The filename had the title where the author goes and vice versa
+    dune = {"title": "Dune", "authors": ["Frank Herbert"]}
+    fake_fetch, sent = timed_search({
+        "intitle:Frank Herbert+inauthor:Dune": (0, None),
+        "intitle:Dune+inauthor:Frank Herbert": (0, dune),
+        "intitle:Frank Herbert": (0, None),
+        "intitle:Dune": (0, None),
+        })
+    with patch("book_org.fetcher.fetch_google_books", fake_fetch):
+        result = fetcher.fetch_metadata_by_title_author(
+            "Dune", "Frank Herbert"
+            )
+    assert result == dune
+    assert sent == [
+        "intitle:Frank Herbert+inauthor:Dune",
+        "intitle:Dune+inauthor:Frank Herbert",
+        ]
+
+
+@patch('book_org.fetcher.http_get')
+def test_fetch_metadata_by_isbns_survives_invalid_json(mock_get):
+    response = MagicMock(status_code=200)
+    response.json.side_effect = ValueError("Expecting value")
+    mock_get.return_value = response
+    assert fetcher.fetch_metadata_by_isbns(["111", "222"]) == {}
+
+
+@patch('book_org.fetcher.get_session')
+def test_http_get_does_not_cache_non_json_body(mock_session, response_cache):
+    page = MagicMock(status_code=200, text="<html>Busy</html>", headers={})
+    page.json.side_effect = ValueError("Expecting value")
+    mock_session.return_value.get.return_value = page
+    fetcher.http_get("http://example.invalid/api/books")
+    fetcher.http_get("http://example.invalid/api/books")
+    assert mock_session.return_value.get.call_count == 2
+
+
+@patch('book_org.fetcher.get_session')
+def test_http_get_releases_trial_on_unexpected_error(mock_session):
+    breaker = fetcher.CircuitBreaker("example.invalid", min_calls=1,
+                                     cooldown=0)
+    with patch("book_org.breaker.log"):
+        breaker.record(1.0, False)
+    mock_session.return_value.get.side_effect = KeyboardInterrupt
+    with patch.dict(fetcher._breakers, {"example.invalid": breaker}):
+        with pytest.raises(KeyboardInterrupt):
+            fetcher.http_get("http://example.invalid/")
+        # Another trial may go out instead of the breaker staying open
+        assert breaker.state == "half-open"
@@ -69,6 +69,24 @@ def test_move_book_moves_and_creates_dirs(
         mock_link_file.assert_any_call(dummy_book.new_fullpath, expected_link)
 
 
+@patch("book_org.file_sorter.link_file")
+@patch("book_org.file_sorter.os.makedirs")
+@patch("book_org.file_sorter.log")
+def test_move_book_only_writes_through_log(
+        mock_log,
+        mock_makedirs,
+        mock_link_file,
+        capsys
+        ):
+    # Bare prints would land on the progress display's status line
+    dummy_book = DummyBook()
+
+    move_book(dummy_book, dry=True)
+
+    assert capsys.readouterr().out == ""
+    mock_log.assert_any_call("[INFO]", f"New path: {dummy_book.new_fullpath}")
+
+
 @patch("book_org.file_sorter.link_file")
 @patch("book_org.file_sorter.os.makedirs")
 @patch("book_org.file_sorter.log")
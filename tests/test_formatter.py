@@ -1,4 +1,7 @@
+import io
 import os
+import json
+import threading
 import pytest
 from unittest.mock import patch
 from book_org import formatter
@@ -18,6 +21,7 @@ def cleanup_logfile():
 
 def test_log_writes_to_file_and_prints(capfd):
     formatter.log("[INFO]", "Test message")
+    formatter.flush_log()
     assert os.path.exists(LOGFILE)
 
     with open(LOGFILE) as f:
@@ -33,6 +37,18 @@ def test_log_no_print(capfd):
     assert "Hidden message" not in out
 
 
+def test_quiet_output_only_logs_to_file(capfd):
+    with formatter.quiet_output():
+        formatter.log("[INFO]", "Quiet message")
+    formatter.log("[INFO]", "Loud message")
+    out, _ = capfd.readouterr()
+    assert "Quiet message" not in out
+    assert "Loud message" in out
+    formatter.flush_log()
+    with open(LOGFILE) as f:
+        assert "Quiet message" in f.read()
+
+
 @patch("os.get_terminal_size", return_value=os.terminal_size((80, 24)))
 def test_log_separator_prints_correct_line(mock_term, capfd):
     formatter.log("[SEPARATOR]", "=")
@@ -64,16 +80,40 @@ def test_print_selection_output(mock_display_images, capfd):
     assert "image_url" not in out  # Not shown if image display is disabled
 
 
-def test_progress_bar_output(capfd):
-    formatter.columns = 50
-    formatter.progress_bar(10, 5)
-    out, _ = capfd.readouterr()
-    assert "50.0%" in out
-    assert "#" in out
-
-
-def test_can_display_images_returns_true():
-    assert formatter.can_display_images() is True
+@patch("book_org.formatter.shutil.which", return_value="/usr/bin/kitty")
+@patch("book_org.formatter.sys.stdout")
+def test_can_display_images_detects_kitty_once(mock_stdout, mock_which):
+    mock_stdout.isatty.return_value = True
+    formatter.can_display_images.cache_clear()
+    try:
+        with patch.dict(os.environ, {"TERM": "xterm-kitty"}):
+            assert formatter.can_display_images() is True
+        # Cached: the terminal does not change during a run
+        with patch.dict(os.environ, {"TERM": "dumb"}):
+            assert formatter.can_display_images() is True
+        assert mock_stdout.isatty.call_count == 1
+
+        formatter.can_display_images.cache_clear()
+        with patch.dict(os.environ, {"TERM": "xterm-256color"}):
+            os.environ.pop("KITTY_WINDOW_ID", None)
+            assert formatter.can_display_images() is False
+    finally:
+        formatter.can_display_images.cache_clear()
+
+
+@patch("book_org.formatter.show_image_in_kitty")
+@patch("book_org.formatter.fetch_thumbnail")
+@patch("book_org.formatter.can_display_images", return_value=True)
+def test_print_selection_previews_cached_thumbnails(
+    mock_display_images, mock_fetch, mock_show, capfd
+):
+    mock_fetch.side_effect = lambda url: \
+        "thumbnails/abc" if url == "http://covers/1.jpg" else None
+    formatter.print_selection([
+        {"title": "Cached", "image_url": "http://covers/1.jpg"},
+        {"title": "Unreachable", "image_url": "http://covers/2.jpg"},
+        ])
+    mock_show.assert_called_once_with("thumbnails/abc")
 
 
 @patch("subprocess.run")
@@ -87,6 +127,7 @@ def test_show_image_in_kitty_runs_subprocess(mock_run):
 def test_log_with_unicode_and_special_chars(capfd):
     message = "Testing ✨🚀🔥 special chars & unicode"
     formatter.log("[DEBUG]", message)
+    formatter.flush_log()
     with open(LOGFILE) as f:
         assert message in f.read()
 
@@ -118,25 +159,121 @@ def test_log_separator_with_large_terminal(mock_term, capfd):
     assert "-" * (200 - 12) in out
 
 
-@patch("book_org.formatter.get_terminal_columns", return_value=0)
-def test_progress_bar_tiny_terminal(mock_get_cols, capfd):
-    # Should skip printing entirely when terminal is too small
-    formatter.progress_bar(10, 5)
-    out, _ = capfd.readouterr()
-    assert out.strip() == ""  # Nothing printed due to small terminal
-
-
-@patch("book_org.formatter.get_terminal_columns", return_value=50)
-def test_progress_bar_zero_total(mock_get_cols, capfd):
-    formatter.progress_bar(0, 5)
-    out, _ = capfd.readouterr()
-    assert "100%" in out
-    assert "#"*44 in out
-
-
 @patch("subprocess.run", side_effect=Exception("Kitty failed"))
 def test_show_image_in_kitty_fails_gracefully(mock_run):
     try:
         formatter.show_image_in_kitty("fake.png")  # Should not raise
     except Exception:
         pytest.fail("Exception should be caught internally")
+
+
+def test_log_context_fields_reach_json_lines():
+    formatter.configure_logging(json_lines=True)
+    try:
+        with formatter.log_context(book="a.pdf", stage="fetch"):
+            formatter.log("[INFO]", "inside", noprint=True)
+        formatter.flush_log()
+    finally:
+        formatter.configure_logging(json_lines=False)
+
+    with open(LOGFILE) as f:
+        entry = json.loads(f.read().splitlines()[-1])
+    assert entry["book"] == "a.pdf"
+    assert entry["stage"] == "fetch"
+
+
+class FakeStream(io.StringIO):
+    def __init__(self, tty):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+@patch("book_org.formatter.get_terminal_columns", return_value=200)
+def test_progress_display_redraws_in_place_on_tty(mock_cols):
+    stream = FakeStream(tty=True)
+    display = formatter.ProgressDisplay(stream, refresh_interval=0)
+    stages = {"fetch": {"completed": 4, "queued": 2}}
+    display.update(4, 10, api_calls=8, stages=stages)
+    display.update(5, 10, api_calls=9, stages=stages)
+    display.close()
+
+    out = stream.getvalue()
+    assert out.count("\r\033[K") == 3  # two updates and the final draw
+    assert out.count("\n") == 1
+    assert "5/10" in out and "books/s" in out and "API/s" in out
+    assert "fetch" in out and "q2" in out and "ETA" in out
+
+
+def test_progress_display_is_rate_limited():
+    stream = FakeStream(tty=True)
+    display = formatter.ProgressDisplay(stream, refresh_interval=60)
+    for n in range(100):
+        display.update(n, 100)
+
+    assert stream.getvalue().count("\r") == 1
+
+
+def test_progress_display_prints_summaries_when_not_a_tty():
+    stream = FakeStream(tty=False)
+    display = formatter.ProgressDisplay(stream, summary_interval=60)
+    for n in range(100):
+        display.update(n, 1000, discovering=True)
+    display.close()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert all(line.startswith("[PROGRESS]") for line in lines)
+    assert "99/1000+" in lines[-1]
+    assert "\r" not in stream.getvalue()
+
+
+def test_log_clears_active_progress_line(capfd):
+    stream = FakeStream(tty=True)
+    with formatter.ProgressDisplay(stream, refresh_interval=0) as display:
+        display.update(1, 2)
+        formatter.log("[INFO]", "message")
+        assert stream.getvalue().endswith("\r\033[K")
+
+
+def test_suspended_display_does_not_redraw(capfd):
+    stream = FakeStream(tty=True)
+    with formatter.ProgressDisplay(stream, refresh_interval=0) as display:
+        display.update(1, 2)
+        with formatter.suspend_progress():
+            assert stream.getvalue().endswith("\r\033[K")
+            written = stream.getvalue()
+            display.update(2, 2)
+            assert stream.getvalue() == written
+        display.update(2, 2)
+        assert stream.getvalue() != written
+
+
+def test_log_from_other_thread_is_held_during_prompt(capfd):
+    stream = FakeStream(tty=True)
+    with formatter.ProgressDisplay(stream, refresh_interval=0):
+        with formatter.suspend_progress():
+            worker = threading.Thread(
+                target=formatter.log, args=("[INFO]", "from worker")
+                )
+            worker.start()
+            worker.join()
+            formatter.log("[INFO]", "from prompt")
+    out = capfd.readouterr().out
+    assert "from prompt" in out
+    assert "from worker" not in out
+
+
+def test_captured_log_is_written_on_replay(capfd):
+    with formatter.captured_log() as records:
+        formatter.log("[WARN]", "Captured message", book="a.pdf")
+    out, _ = capfd.readouterr()
+    assert "Captured message" not in out
+    assert records == [("[WARN]", "Captured message", False,
+                        {"book": "a.pdf"})]
+
+    formatter.replay_log(records)
+    out, _ = capfd.readouterr()
+    assert "[WARN] Captured message" in out
@@ -0,0 +1,122 @@
+# tests/test_http_cache.py
+
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+from book_org.http_cache import ResponseCache, normalize_url
+
+
+URL = "https://www.googleapis.com/books/v1/volumes?q=intitle:Dune"
+
+
+def response(text, status_code=200):
+    return MagicMock(text=text, status_code=status_code)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), 1024)
+    yield cache
+    cache.close()
+
+
+def test_normalize_url_ignores_case_spacing_and_parameter_order():
+    assert normalize_url(
+        "HTTPS://WWW.googleapis.com/books/v1/volumes?q=intitle:Dune%20%20"
+        "Messiah&orderBy=relevance"
+        ) == normalize_url(
+        "https://www.googleapis.com/books/v1/volumes?orderBy=relevance"
+        "&q=intitle:dune messiah"
+        )
+
+
+def test_get_unknown_url_returns_none(cache):
+    assert cache.get(URL) is None
+
+
+def test_put_and_get(cache):
+    cache.put(URL, response('{"items": []}'), 60)
+    cached = cache.get(URL)
+    assert cached.status_code == 200
+    assert cached.json() == {"items": []}
+    assert cached.from_cache
+
+
+def test_expired_entries_are_not_served(cache):
+    with patch("book_org.http_cache.time.time", return_value=0):
+        cache.put(URL, response("{}"), 60)
+    with patch("book_org.http_cache.time.time", return_value=61):
+        assert cache.get(URL) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    body = "x" * 400
+    with patch("book_org.http_cache.time.time", return_value=1):
+        cache.put(URL + "1", response(body), 60)
+    with patch("book_org.http_cache.time.time", return_value=2):
+        cache.put(URL + "2", response(body), 60)
+    with patch("book_org.http_cache.time.time", return_value=3):
+        cache.get(URL + "1")
+    with patch("book_org.http_cache.time.time", return_value=4):
+        cache.put(URL + "3", response(body), 60)
+
+        assert cache.get(URL + "2") is None
+        assert cache.get(URL + "1") is not None
+        assert cache.get(URL + "3") is not None
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = ResponseCache(path, 1024)
+    first.put(URL, response('{"items": [1]}'), 60)
+    first.close()
+
+    second = ResponseCache(path, 1024)
+    assert second.get(URL).json() == {"items": [1]}
+    second.close()
+
+
+def test_misses_expire_after_their_ttl(cache):
+    with patch("book_org.http_cache.time.time", return_value=0):
+        cache.record_miss("isbn:123", 10)
+        assert cache.is_miss("isbn:123")
+        assert not cache.is_miss("isbn:456")
+    with patch("book_org.http_cache.time.time", return_value=11):
+        assert not cache.is_miss("isbn:123")
+
+
+def test_cache_of_an_older_layout_is_emptied(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE responses (url TEXT PRIMARY KEY, status INTEGER, "
+            "body TEXT, size INTEGER, stored REAL, accessed REAL)"
+            )
+        connection.execute(
+            "INSERT INTO responses VALUES (?, 200, '{}', 2, 0, 0)", (URL,)
+            )
+    connection.close()
+
+    cache = ResponseCache(path, 1024)
+    assert cache.get(URL) is None
+    cache.put(URL, response("{}"), 60)
+    assert cache.get(URL) is not None
+    cache.close()
+
+
+def test_expired_entries_are_purged_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = ResponseCache(path, 1024)
+    with patch("book_org.http_cache.time.time", return_value=0):
+        first.put(URL, response("x" * 100), 60)
+        first.record_miss("isbn:123", 10)
+    first.close()
+
+    second = ResponseCache(path, 1024)
+    assert second._size == 0
+    count = second._connection.execute(
+        "SELECT (SELECT COUNT(*) FROM responses) "
+        "+ (SELECT COUNT(*) FROM misses)"
+        ).fetchone()[0]
+    assert count == 0
+    second.close()
@@ -0,0 +1,88 @@
+# tests/test_journal.py
+
+import os
+import pytest
+from unittest.mock import MagicMock
+from book_org.journal import Journal
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+def make_book(path):
+    book = MagicMock(fullpath=path)
+    book.to_record.return_value = {"categories": ["art"]}
+    return book
+
+
+def test_resume_reads_back_previous_progress(journal_path):
+    journal = Journal(journal_path)
+    journal.record_organized(make_book("a.pdf"))
+    journal.record_moved(make_book("a.pdf"))
+    journal.record_organized(make_book("b.pdf"))
+    journal.close()
+
+    resumed = Journal(journal_path, resume=True)
+    assert resumed.is_moved("a.pdf")
+    assert not resumed.is_moved("b.pdf")
+    assert resumed.lookup("b.pdf") == {"categories": ["art"]}
+    assert resumed.lookup("c.pdf") is None
+    resumed.close()
+
+
+def test_deferred_books_are_settled_but_not_moved(journal_path):
+    journal = Journal(journal_path)
+    journal.record_organized(make_book("a.pdf"))
+    journal.record_deferred(make_book("a.pdf"))
+    journal.close()
+
+    resumed = Journal(journal_path, resume=True)
+    assert not resumed.is_moved("a.pdf")
+    assert resumed.is_settled("a.pdf")
+    assert not resumed.is_settled("b.pdf")
+    resumed.close()
+
+
+def test_new_run_starts_a_fresh_journal(journal_path):
+    journal = Journal(journal_path)
+    journal.record_moved(make_book("a.pdf"))
+    journal.close()
+
+    fresh = Journal(journal_path)
+    assert not fresh.is_moved("a.pdf")
+    fresh.close()
+    assert not Journal(journal_path, resume=True).is_moved("a.pdf")
+
+
+def test_truncated_last_line_is_ignored(journal_path):
+    journal = Journal(journal_path)
+    journal.record_moved(make_book("a.pdf"))
+    journal.close()
+    with open(journal_path, "a") as f:
+        f.write('{"stage": "moved", "pa')
+
+    resumed = Journal(journal_path, resume=True)
+    assert resumed.is_moved("a.pdf")
+    resumed.record_moved(make_book("b.pdf"))
+    resumed.close()
+
+    # What was written after the cut-off line is read back too
+    again = Journal(journal_path, resume=True)
+    assert again.is_moved("a.pdf") and again.is_moved("b.pdf")
+    again.close()
+
+
+def test_journal_without_path_keeps_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    journal = Journal(None)
+    journal.record_moved(make_book("a.pdf"))
+    journal.close(completed=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_completed_run_removes_the_journal(journal_path):
+    journal = Journal(journal_path)
+    journal.close(completed=True)
+    assert not os.path.exists(journal_path)
@@ -0,0 +1,64 @@
+# tests/test_logwriter.py
+
+import json
+import os
+import pytest
+from book_org.logwriter import LogWriter
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "logfile.txt")
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_lines_are_written_after_flush(log_path):
+    writer = LogWriter(log_path)
+    for n in range(100):
+        writer.write("[INFO]", f"line {n}")
+    writer.flush()
+
+    lines = read(log_path).splitlines()
+    assert lines[0] == "[INFO] line 0"
+    assert len(lines) == 100
+    writer.close()
+
+
+def test_json_lines_carry_extra_fields(log_path):
+    writer = LogWriter(log_path, json_lines=True)
+    writer.write("[STAGE]", "fetch", book="a.pdf", stage="fetch",
+                 duration=0.25)
+    writer.close()
+
+    entry = json.loads(read(log_path))
+    assert entry["message"] == "fetch"
+    assert entry["book"] == "a.pdf"
+    assert entry["duration"] == 0.25
+
+
+def test_rotates_when_file_grows_too_large(log_path):
+    writer = LogWriter(log_path, max_bytes=100, backups=2)
+    for n in range(30):
+        writer.write("[INFO]", f"line {n:02d} padding padding")
+        writer.flush()
+    writer.close()
+
+    assert os.path.exists(f"{log_path}.1")
+    assert os.path.exists(f"{log_path}.2")
+    assert not os.path.exists(f"{log_path}.3")
+    assert os.path.getsize(log_path) < 100
+
+
+def test_reopens_removed_file(log_path):
+    writer = LogWriter(log_path)
+    writer.write("[INFO]", "first")
+    writer.flush()
+    os.remove(log_path)
+
+    writer.write("[INFO]", "second")
+    writer.close()
+    assert read(log_path) == "[INFO] second\n"
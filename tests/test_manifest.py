@@ -0,0 +1,93 @@
+# tests/test_manifest.py
+
+import os
+import sqlite3
+import pytest
+from book_org.manifest import Manifest, file_identity
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+
+@pytest.fixture
+def book_file(tmp_path):
+    path = tmp_path / "book.pdf"
+    path.write_text("dummy")
+    return str(path)
+
+
+def test_lookup_unknown_file_returns_none(manifest, book_file):
+    assert manifest.lookup(book_file) is None
+
+
+def test_lookup_missing_file_returns_none(manifest, tmp_path):
+    assert manifest.lookup(str(tmp_path / "gone.pdf")) is None
+
+
+def test_store_and_lookup_unchanged_file(manifest, book_file):
+    record = {"metadata": {"title": "Book"}, "categories": ["science"]}
+    manifest.store(file_identity(book_file), book_file, record)
+    assert manifest.lookup(book_file) == record
+
+
+def test_changed_file_is_not_replayed(manifest, book_file):
+    manifest.store(
+        file_identity(book_file), book_file, {"categories": ["science"]}
+        )
+
+    with open(book_file, "a") as f:
+        f.write("more content")
+
+    assert manifest.lookup(book_file) is None
+
+
+def test_touched_file_is_not_replayed(manifest, book_file):
+    manifest.store(
+        file_identity(book_file), book_file, {"categories": ["science"]}
+        )
+
+    stat = os.stat(book_file)
+    os.utime(book_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert manifest.lookup(book_file) is None
+
+
+def test_records_persist_across_instances(tmp_path, book_file):
+    path = str(tmp_path / "manifest.sqlite")
+    first = Manifest(path)
+    first.store(
+        file_identity(book_file), book_file, {"categories": ["art"]}
+        )
+    first.close()
+
+    second = Manifest(path)
+    assert second.lookup(book_file) == {"categories": ["art"]}
+    second.close()
+
+
+def test_moved_file_is_still_replayed(manifest, book_file, tmp_path):
+    manifest.store(file_identity(book_file), book_file, {"categories": []})
+    moved = str(tmp_path / "moved.pdf")
+    os.rename(book_file, moved)
+    assert manifest.lookup(moved) == {"categories": []}
+
+
+def test_manifest_of_older_layout_is_rebuilt(tmp_path, book_file):
+    path = str(tmp_path / "manifest.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE books (path TEXT PRIMARY KEY, size INTEGER, "
+        "mtime_ns INTEGER, inode INTEGER, record TEXT)"
+        )
+    connection.commit()
+    connection.close()
+
+    manifest = Manifest(path)
+    assert manifest.lookup(book_file) is None
+    manifest.store(file_identity(book_file), book_file, {"categories": []})
+    assert manifest.lookup(book_file) == {"categories": []}
+    manifest.close()
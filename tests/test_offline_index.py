@@ -0,0 +1,130 @@
+# tests/test_offline_index.py
+
+import gzip
+import json
+import time
+import pytest
+from book_org import offline_index
+from book_org.offline_index import OfflineIndex, build_index, parse_edition
+
+
+EDITIONS = [
+    {
+        "key": "/books/OL1M",
+        "title": "Dune",
+        "authors": [{"key": "/authors/OL1A"}],
+        "publish_date": "August 1965",
+        "publishers": ["Chilton Books"],
+        "isbn_10": ["0-441-17271-7"],
+        "isbn_13": ["9780441172719"],
+        "subjects": ["Science Fiction"],
+        "covers": [12345],
+    },
+    {
+        "key": "/books/OL2M",
+        "title": "Stranger in a Strange Land",
+        "authors": [{"key": "/authors/OL2A"}],
+        "isbn_10": ["044179034X"],
+    },
+    {"key": "/books/OL3M", "authors": [{"key": "/authors/OL1A"}]},
+]
+AUTHORS = [
+    {"key": "/authors/OL1A", "name": "Frank Herbert"},
+    {"key": "/authors/OL2A", "name": "Robert A. Heinlein"},
+]
+
+
+def dump_line(record):
+    # Open Library dump layout: type, key, revision, last modified, JSON
+    return "\t".join([
+        "/type/edition", record["key"], "1", "2020-01-01T00:00:00",
+        json.dumps(record)
+        ]) + "\n"
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    editions = tmp_path / "editions.txt.gz"
+    with gzip.open(editions, "wt") as dump:
+        dump.writelines(dump_line(record) for record in EDITIONS)
+        dump.write("not json\n")
+    authors = tmp_path / "authors.txt"
+    authors.write_text("".join(dump_line(author) for author in AUTHORS))
+
+    path = str(tmp_path / "index.sqlite")
+    assert build_index(path, str(editions), str(authors)) == 2
+    return path
+
+
+@pytest.fixture
+def index(index_path):
+    index = OfflineIndex(index_path)
+    yield index
+    index.close()
+
+
+def test_lookup_by_isbn_10_and_13(index):
+    assert index.lookup_isbn("9780441172719")["title"] == "Dune"
+    assert index.lookup_isbn("0441172717")["title"] == "Dune"
+    assert index.lookup_isbn("0-441-79034-x")["isbn"] == "044179034X"
+    assert index.lookup_isbn("9999999999") is None
+
+
+def test_lookup_by_normalized_author_and_title(index):
+    metadata = index.lookup_title_author("frank  herbert", "DUNE!")
+    assert metadata == {
+        "title": "Dune",
+        "authors": ["Frank Herbert"],
+        "published": "1965",
+        "isbn": "9780441172719",
+        "publisher": "Chilton Books",
+        "categories": ["science fiction"],
+        "image_url": "https://covers.openlibrary.org/b/id/12345-M.jpg",
+    }
+    assert index.lookup_title_author("Herbert", "Dune") is None
+
+
+def test_lookups_are_fast(index):
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.lookup_isbn("9780441172719")
+    assert (time.perf_counter() - start) / 1000 < 0.001
+
+
+def test_build_reads_json_lines_with_author_names(tmp_path):
+    editions = tmp_path / "editions.jsonl"
+    editions.write_text(json.dumps(
+        {"title": "Dune", "authors": [{"name": "Frank Herbert"}]}
+        ) + "\n")
+    path = str(tmp_path / "index.sqlite")
+    build_index(path, str(editions))
+
+    index = OfflineIndex(path)
+    assert index.lookup_title_author("Frank Herbert", "Dune")
+    index.close()
+
+
+def test_parse_edition_missing_fields():
+    assert parse_edition({"title": "Dune"}) == {
+        "title": "Dune",
+        "authors": [],
+        "published": "",
+        "isbn": "",
+        "publisher": "",
+        "categories": [],
+        "image_url": None,
+    }
+
+
+def test_module_lookups_need_an_open_index(index_path):
+    assert offline_index.lookup_isbn("9780441172719") is None
+
+    offline_index.open_index(index_path)
+    try:
+        assert offline_index.lookup_isbn("9780441172719")["title"] == "Dune"
+        assert offline_index.lookup_title_author(
+            "Robert A. Heinlein", "Stranger in a Strange Land"
+            )["isbn"] == "044179034X"
+    finally:
+        offline_index.close_index()
+    assert offline_index.lookup_isbn("9780441172719") is None
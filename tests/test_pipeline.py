@@ -0,0 +1,120 @@
+# tests/test_pipeline.py
+
+import random
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from book_org.pipeline import Pipeline, Stage
+
+
+def test_results_come_out_in_input_order():
+    def slow_square(n):
+        time.sleep(random.random() / 100)
+        return n * n
+
+    pipeline = Pipeline([
+        Stage("add", lambda n: n + 1, workers=3),
+        Stage("square", slow_square, workers=8),
+        ])
+
+    assert list(pipeline.run(range(50))) == [
+        (n + 1) ** 2 for n in range(50)
+        ]
+
+
+def test_stages_run_concurrently():
+    in_flight = []
+    lock = threading.Lock()
+    active = [0]
+
+    def wait(n):
+        with lock:
+            active[0] += 1
+            in_flight.append(active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return n
+
+    pipeline = Pipeline([Stage("wait", wait, workers=4)])
+    list(pipeline.run(range(12)))
+
+    assert max(in_flight) > 1
+
+
+def test_items_in_flight_are_bounded():
+    pulled = []
+
+    def items():
+        for n in range(1000):
+            pulled.append(n)
+            yield n
+
+    pipeline = Pipeline([Stage("identity", lambda n: n, queue_size=2)])
+    results = pipeline.run(items())
+    next(results)
+    time.sleep(0.05)
+
+    assert len(pulled) < 20
+    results.close()
+
+
+def test_stage_error_is_raised_in_order():
+    def fail_on_three(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return n
+
+    pipeline = Pipeline([Stage("check", fail_on_three, workers=4)])
+    seen = []
+    with pytest.raises(ValueError):
+        for n in pipeline.run(range(10)):
+            seen.append(n)
+
+    assert seen == [0, 1, 2]
+
+
+def test_queue_depths_names_every_stage():
+    pipeline = Pipeline([Stage("a", str), Stage("b", int)])
+    assert list(pipeline.run(["1", "2"])) == [1, 2]
+    assert set(pipeline.queue_depths()) == {"a", "b", "output"}
+
+
+def test_batch_stage_gets_lists_and_keeps_order():
+    batches = []
+
+    def record_batch(values):
+        batches.append(len(values))
+        return [n * 10 for n in values]
+
+    pipeline = Pipeline([
+        Stage("add", lambda n: n + 1, workers=3),
+        Stage("batch", record_batch, batch_size=4, batch_wait=0.05),
+        ])
+
+    assert list(pipeline.run(range(10))) == [
+        (n + 1) * 10 for n in range(10)
+        ]
+    assert sum(batches) == 10
+    assert max(batches) <= 4
+    assert pipeline.stats()["batch"]["completed"] == 10
+
+
+def test_batch_stage_failure_fails_every_item_of_the_batch():
+    def explode(values):
+        raise ValueError("batch failed")
+
+    pipeline = Pipeline([Stage("batch", explode, batch_size=4)])
+    with pytest.raises(ValueError):
+        list(pipeline.run(range(3)))
+
+
+@pytest.mark.parametrize("json_lines, lines", [(False, 0), (True, 3)])
+def test_stage_lines_are_only_logged_for_json_logs(json_lines, lines):
+    pipeline = Pipeline([Stage("add", lambda n: n + 1)])
+    with patch("book_org.pipeline.log") as mock_log, \
+            patch("book_org.pipeline.json_logging", return_value=json_lines), \
+            patch("book_org.pipeline.profiler.is_enabled", return_value=False):
+        assert list(pipeline.run(range(3))) == [1, 2, 3]
+    assert mock_log.call_count == lines
@@ -0,0 +1,62 @@
+# tests/test_profiler.py
+
+import json
+import pytest
+from book_org import profiler
+
+
+@pytest.fixture(autouse=True)
+def disable_profiler():
+    yield
+    profiler.disable()
+
+
+@profiler.timed("sample")
+def sample(value):
+    return value
+
+
+def test_timed_records_nothing_when_disabled():
+    profiler.enable()
+    profiler.disable()
+    assert sample(1) == 1
+    assert profiler.summary()["stages"] == {}
+
+
+def test_timed_records_calls_when_enabled():
+    profiler.enable()
+    for n in range(5):
+        assert sample(n) == n
+    with profiler.stopwatch("block"):
+        pass
+
+    stages = profiler.summary()["stages"]
+    assert stages["sample"]["count"] == 5
+    assert stages["block"]["count"] == 1
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert profiler.percentile(values, 50) == 51
+    assert profiler.percentile(values, 99) == 99
+    assert profiler.percentile([], 95) == 0.0
+
+
+def test_api_calls_per_book():
+    profiler.enable()
+    profiler.count("books", 4)
+    profiler.count("api_calls", 10)
+    assert profiler.summary()["api_calls_per_book"] == 2.5
+
+
+def test_report_prints_and_writes_json(tmp_path, capfd):
+    profiler.enable()
+    sample(1)
+    path = tmp_path / "profile.json"
+
+    profiler.report(str(path))
+
+    out, _ = capfd.readouterr()
+    assert "sample" in out
+    with open(path) as f:
+        assert json.load(f)["stages"]["sample"]["count"] == 1
@@ -0,0 +1,120 @@
+# tests/test_providers.py
+
+import pytest
+from unittest.mock import patch
+from book_org import providers
+from book_org.breaker import CircuitBreaker
+
+METADATA = {"title": "Dune", "authors": ["Frank Herbert"]}
+
+
+def breakers(google=None, openlib=None):
+    return {
+        "www.googleapis.com": google or CircuitBreaker("www.googleapis.com"),
+        "openlibrary.org": openlib or CircuitBreaker("openlibrary.org"),
+        }
+
+
+def open_breaker(host):
+    breaker = CircuitBreaker(host, min_calls=1)
+    with patch("book_org.breaker.log"):
+        breaker.record(1.0, False)
+    return breaker
+
+
+def slow_breaker(host):
+    breaker = CircuitBreaker(host)
+    breaker.record(providers.PROVIDER_SLOW_LATENCY + 1, True)
+    return breaker
+
+
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn')
+def test_isbn_lookup_falls_back_to_next_provider(mock_google, mock_openlib):
+    mock_google.return_value = None
+    mock_openlib.return_value = METADATA
+    with patch.dict('book_org.fetcher._breakers', breakers(), clear=True):
+        assert providers.fetch_metadata_by_isbn("9780441172719") == METADATA
+    mock_google.assert_called_once_with("9780441172719")
+    mock_openlib.assert_called_once_with("9780441172719")
+
+
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn')
+def test_first_provider_that_finds_the_book_wins(mock_google, mock_openlib):
+    mock_google.return_value = METADATA
+    with patch.dict('book_org.fetcher._breakers', breakers(), clear=True):
+        assert providers.fetch_metadata_by_isbn("9780441172719") == METADATA
+    mock_openlib.assert_not_called()
+
+
+@patch('book_org.providers.log')
+@patch('book_org.providers.fetcher.fetch_metadata_by_title_author_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_title_author')
+def test_open_circuit_skips_provider(mock_google, mock_openlib, mock_log):
+    mock_openlib.return_value = METADATA
+    down = breakers(google=open_breaker("www.googleapis.com"))
+    with patch.dict('book_org.fetcher._breakers', down, clear=True):
+        assert providers.fetch_metadata_by_title_author(
+            "Frank Herbert", "Dune", filename="Dune.epub"
+            ) == METADATA
+    mock_google.assert_not_called()
+    mock_openlib.assert_called_once_with(
+        "Frank Herbert", "Dune", "Dune.epub"
+        )
+
+
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn')
+def test_slow_provider_is_asked_last(mock_google, mock_openlib):
+    mock_openlib.return_value = METADATA
+    slow = breakers(google=slow_breaker("www.googleapis.com"))
+    with patch.dict('book_org.fetcher._breakers', slow, clear=True):
+        assert [p.name for p in providers.ranked_providers()] == \
+            ["Open Library", "Google Books"]
+        assert providers.fetch_metadata_by_isbn("9780441172719") == METADATA
+    mock_google.assert_not_called()
+
+
+@patch('book_org.providers.log')
+def test_no_available_provider_finds_nothing(mock_log):
+    down = breakers(open_breaker("www.googleapis.com"),
+                    open_breaker("openlibrary.org"))
+    with patch.dict('book_org.fetcher._breakers', down, clear=True):
+        assert providers.fetch_metadata_by_isbn("9780441172719") is None
+
+
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_isbn', return_value=None)
+def test_isbn_lookup_skips_providers_that_answered(mock_google, mock_openlib):
+    with patch.dict('book_org.fetcher._breakers', breakers(), clear=True):
+        assert providers.fetch_metadata_by_isbn(
+            "9780441172719", skip=["Open Library"]
+            ) is None
+    mock_google.assert_called_once()
+    mock_openlib.assert_not_called()
+
+
+def test_provider_must_implement_lookups():
+    class Partial(providers.Provider):
+        def api(self):
+            return "https://example.com/"
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@patch('book_org.providers.fetcher.fetch_metadata_by_title_author_openlib')
+@patch('book_org.providers.fetcher.fetch_metadata_by_title_author')
+def test_candidates_stop_the_provider_chain(mock_google, mock_openlib):
+    def offer(author, title, candidates=None, **options):
+        candidates.append(METADATA)
+        return None
+    mock_google.side_effect = offer
+    candidates = []
+    with patch.dict('book_org.fetcher._breakers', breakers(), clear=True):
+        assert providers.fetch_metadata_by_title_author(
+            "Frank Herbert", "Dune", candidates=candidates
+            ) is None
+    assert candidates == [METADATA]
+    mock_openlib.assert_not_called()
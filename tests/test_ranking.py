@@ -0,0 +1,65 @@
+# tests/test_ranking.py
+
+from book_org import ranking
+
+
+DUNE = {"title": "Dune", "authors": "Frank Herbert", "year": "1965",
+        "publisher": "Chilton Books"}
+
+
+def candidate(title="Dune", authors=("Frank Herbert",), published="1965",
+              publisher="Chilton Books"):
+    return {"title": title, "authors": list(authors),
+            "published": published, "publisher": publisher}
+
+
+def test_exact_match_scores_one():
+    assert ranking.score_candidate(candidate(), DUNE) == 1.0
+
+
+def test_subtitle_is_ignored_for_title_similarity():
+    assert ranking.title_similarity(
+        "Dune", "Dune: Deluxe Edition"
+        ) == 1.0
+
+
+def test_author_overlap_counts_name_words():
+    assert ranking.author_overlap("Frank Herbert", ["Herbert, Frank"]) == 1
+    assert ranking.author_overlap("Frank Herbert", ["Brian Herbert"]) == 0.5
+    assert ranking.author_overlap("", ["Frank Herbert"]) == 0
+
+
+def test_year_match_allows_a_year_off():
+    assert ranking.year_match("1965", "1965") == 1.0
+    assert ranking.year_match("1965", "1966") == 0.5
+    assert ranking.year_match("1965", "1984") == 0.0
+    assert ranking.year_match("1965", "") == 0.0
+
+
+def test_missing_filename_fields_are_left_out_of_the_score():
+    expected = {"title": "Dune", "authors": "Frank Herbert"}
+    assert ranking.score_candidate(
+        candidate(published="", publisher=""), expected
+        ) == 1.0
+
+
+def test_rank_candidates_puts_best_match_first():
+    candidates = [
+        candidate(title="Dune Messiah"),
+        candidate(authors=["Brian Herbert"], published="2000"),
+        candidate(),
+        ]
+    ranked = ranking.rank_candidates(candidates, DUNE)
+    assert ranked[0][1] is candidates[2]
+    assert [score for score, _ in ranked] == sorted(
+        (score for score, _ in ranked), reverse=True
+        )
+
+
+def test_is_good_match_threshold():
+    assert ranking.is_good_match(candidate(), DUNE)
+    assert not ranking.is_good_match(
+        candidate(title="Dune Road", authors=["Jim Bob"], published="2010",
+                  publisher="Tor"),
+        DUNE
+        )
@@ -0,0 +1,42 @@
+# tests/test_ratelimit.py
+
+import time
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+from book_org.ratelimit import TokenBucket, backoff_delay, retry_after
+
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(10):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 tokens right away, the other 5 at 50 per second
+    assert 0.08 <= elapsed < 0.5
+
+
+def test_token_bucket_pause_holds_callers_back():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.1)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    with patch("book_org.ratelimit.random.uniform") as mock_uniform:
+        backoff_delay(3, 0.5, 60)
+        backoff_delay(20, 0.5, 60)
+    assert mock_uniform.call_args_list[0].args == (0, 4.0)
+    assert mock_uniform.call_args_list[1].args == (0, 60)
+
+
+def test_retry_after_seconds_and_date():
+    assert retry_after(MagicMock(headers={"Retry-After": "7"})) == 7.0
+    assert retry_after(MagicMock(headers={})) is None
+    assert retry_after(MagicMock(headers={"Retry-After": "soon"})) is None
+
+    date = formatdate(time.time() + 30, usegmt=True)
+    delay = retry_after(MagicMock(headers={"Retry-After": date}))
+    assert 28 <= delay <= 30
@@ -0,0 +1,77 @@
+# tests/test_review.py
+
+from unittest.mock import MagicMock, patch
+from book_org.review import ReviewQueue, review_books
+
+CANDIDATES = [
+    {"title": "Dune Messiah", "authors": ["Frank Herbert"], "isbn": "1"},
+    {"title": "Dune", "authors": ["Frank Herbert"], "isbn": "2"},
+]
+
+
+def queued(tmp_path, *names):
+    queue = ReviewQueue(str(tmp_path / "review.sqlite"))
+    for name in names:
+        file = tmp_path / name
+        file.write_text("dummy")
+        queue.add(MagicMock(
+            fullpath=str(file),
+            output_path_dir=str(tmp_path / "organized"),
+            review_candidates=CANDIDATES
+            ))
+    return queue
+
+
+def test_review_queue_persists_books_and_candidates(tmp_path):
+    queue = queued(tmp_path, "b.epub", "a.epub")
+    queue.close()
+
+    queue = ReviewQueue(str(tmp_path / "review.sqlite"))
+    pending = queue.pending()
+    assert [path for path, _, _ in pending] == \
+        [str(tmp_path / "b.epub"), str(tmp_path / "a.epub")]
+    assert pending[0][1] == str(tmp_path / "organized")
+    assert pending[0][2] == CANDIDATES
+
+    queue.remove(str(tmp_path / "b.epub"))
+    assert len(queue.pending()) == 1
+    queue.close()
+
+
+@patch("book_org.review.print_selection")
+@patch("book_org.review.log")
+@patch("book_org.review.move_book")
+@patch("builtins.input", side_effect=["1", "", "n"])
+def test_review_books_applies_decisions(
+    mock_input, mock_move, mock_log, mock_print, tmp_path
+):
+    queue = queued(tmp_path, "chosen.epub", "skipped.epub", "none.epub")
+
+    review_books(queue)
+
+    chosen, none = [call.args[0] for call in mock_move.call_args_list]
+    assert chosen.new_filename == "Frank Herbert - Dune [2].epub"
+    assert chosen.new_path == str(tmp_path / "organized" / "uncategorized")
+    assert none.new_path == str(tmp_path / "organized" / "no-metadata")
+    # Only the skipped book is left to review
+    assert [path for path, _, _ in queue.pending()] == \
+        [str(tmp_path / "skipped.epub")]
+    queue.close()
+
+
+@patch("book_org.review.print_selection")
+@patch("book_org.review.log")
+@patch("book_org.review.move_book")
+@patch("builtins.input", return_value="q")
+def test_review_books_quits_and_drops_missing_files(
+    mock_input, mock_move, mock_log, mock_print, tmp_path
+):
+    queue = queued(tmp_path, "gone.epub", "kept.epub", "later.epub")
+    (tmp_path / "gone.epub").unlink()
+
+    review_books(queue)
+
+    mock_input.assert_called_once()
+    mock_move.assert_not_called()
+    assert len(queue.pending()) == 2
+    queue.close()
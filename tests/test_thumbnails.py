@@ -0,0 +1,94 @@
+# tests/test_thumbnails.py
+
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from book_org import thumbnails
+from book_org.thumbnails import ThumbnailCache
+
+
+@pytest.fixture
+def thumbnail_cache(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbnails"), max_bytes=10)
+    with patch("book_org.thumbnails._cache", cache):
+        yield cache
+    cache.close()
+
+
+def test_thumbnail_cache_is_content_addressed(thumbnail_cache):
+    first = thumbnail_cache.put("http://a/1.jpg", b"cover")
+    second = thumbnail_cache.put("http://b/1.jpg", b"cover")
+    assert first == second
+    assert thumbnail_cache.get("http://b/1.jpg") == first
+    assert thumbnail_cache.get("http://c/1.jpg") is None
+    assert len([name for name in os.listdir(thumbnail_cache.directory)
+                if name != "index.sqlite"]) == 1
+
+
+@patch("book_org.thumbnails.time.time")
+def test_thumbnail_cache_evicts_least_recently_shown(
+    mock_time, thumbnail_cache
+):
+    mock_time.return_value = 1
+    old = thumbnail_cache.put("http://a/old.jpg", b"1111")
+    mock_time.return_value = 2
+    thumbnail_cache.put("http://a/shown.jpg", b"2222")
+    mock_time.return_value = 3
+    thumbnail_cache.get("http://a/old.jpg")
+    mock_time.return_value = 4
+    thumbnail_cache.put("http://a/new.jpg", b"3333")
+
+    assert thumbnail_cache.get("http://a/shown.jpg") is None
+    assert thumbnail_cache.get("http://a/old.jpg") == old
+    assert thumbnail_cache.get("http://a/new.jpg") is not None
+
+
+@patch("book_org.thumbnails._get_session")
+def test_fetch_thumbnail_downloads_once(mock_session, thumbnail_cache):
+    mock_session.return_value.get.return_value = MagicMock(
+        status_code=200, content=b"jpeg",
+        headers={"Content-Type": "image/jpeg"}
+        )
+    path = thumbnails.fetch_thumbnail("http://covers/1.jpg")
+    assert thumbnails.fetch_thumbnail("http://covers/1.jpg") == path
+    assert open(path, "rb").read() == b"jpeg"
+    mock_session.return_value.get.assert_called_once()
+
+
+@patch("book_org.thumbnails._get_session")
+def test_fetch_thumbnail_failure_gives_none(mock_session, thumbnail_cache):
+    mock_session.return_value.get.side_effect = \
+        thumbnails.requests.ConnectionError("refused")
+    assert thumbnails.fetch_thumbnail("http://covers/1.jpg") is None
+    thumbnails.warm_thumbnails([{"title": "No cover"}])
+    mock_session.return_value.get.assert_called_once()
+
+
+@patch("book_org.thumbnails._get_session")
+def test_fetch_thumbnail_offline_sends_nothing(mock_session, thumbnail_cache):
+    thumbnail_cache.put("http://covers/1.jpg", b"jpeg")
+    with patch("book_org.thumbnails._offline", True):
+        assert thumbnails.fetch_thumbnail("http://covers/1.jpg") is not None
+        assert thumbnails.fetch_thumbnail("http://covers/2.jpg") is None
+    mock_session.return_value.get.assert_not_called()
+
+
+@patch("book_org.thumbnails._get_session")
+def test_fetch_thumbnail_ignores_pages_that_are_not_images(
+    mock_session, thumbnail_cache
+):
+    mock_session.return_value.get.return_value = MagicMock(
+        status_code=200, content=b"<html>Not found</html>",
+        headers={"Content-Type": "text/html"}
+        )
+    assert thumbnails.fetch_thumbnail("http://covers/1.jpg") is None
+    assert thumbnail_cache.get("http://covers/1.jpg") is None
+
+
+def test_thumbnail_cache_forgets_deleted_images(thumbnail_cache):
+    path = thumbnail_cache.put("http://a/1.jpg", b"1234")
+    os.remove(path)
+    assert thumbnail_cache.get("http://a/1.jpg") is None
+    assert thumbnail_cache._size == 0
+    thumbnail_cache.put("http://a/2.jpg", b"12345678")
+    assert thumbnail_cache.get("http://a/2.jpg") is not None
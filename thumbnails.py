@@ -0,0 +1,175 @@
+# thumbnails.py
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import requests
+from .config import THUMBNAIL_DIR, THUMBNAIL_CACHE_MAX_BYTES, HTTP_TIMEOUT
+
+_session = None
+_cache = None
+_offline = False
+_lock = threading.Lock()
+
+
+def set_offline(offline=True):
+    """Offline, only covers already on disk are shown."""
+    global _offline
+    _offline = offline
+
+
+def _get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+class ThumbnailCache():
+    """
+    Cover images on disk, named by the SHA-256 of their content so a cover
+    reached through several URLs is stored once. An index maps every URL
+    to its image, and once the images outgrow max_bytes the least recently
+    shown ones are deleted.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"), check_same_thread=False
+            )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                "digest TEXT PRIMARY KEY, size INTEGER, accessed REAL)"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "url TEXT PRIMARY KEY, digest TEXT)"
+                )
+        self._size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM images"
+            ).fetchone()[0]
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest)
+
+    def get(self, url):
+        """Path of the image of url, or None if it is not cached."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT digest FROM urls WHERE url = ?", (url,)
+                ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(self._path(row[0])):
+                # Deleted behind the cache's back: forget it, and its size
+                with self._connection:
+                    self._forget(row[0])
+                return None
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE images SET accessed = ? WHERE digest = ?",
+                    (time.time(), row[0])
+                    )
+        return self._path(row[0])
+
+    def put(self, url, content):
+        """Stores content as the image of url and returns its path."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._path(digest)
+        with self._lock, self._connection:
+            known = self._connection.execute(
+                "SELECT 1 FROM images WHERE digest = ?", (digest,)
+                ).fetchone()
+            if not known or not os.path.exists(path):
+                # Written aside first, so a preview never shows half an image
+                partial = f"{path}.partial"
+                with open(partial, "wb") as image:
+                    image.write(content)
+                os.replace(partial, path)
+            if not known:
+                self._size += len(content)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?)",
+                (digest, len(content), time.time())
+                )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, digest)
+                )
+            if self._size > self.max_bytes:
+                self._evict(keep=digest)
+        return path
+
+    def _evict(self, keep):
+        # Least recently shown first, until the images fit in max_bytes
+        rows = self._connection.execute(
+            "SELECT digest, size FROM images WHERE digest != ? "
+            "ORDER BY accessed", (keep,)
+            ).fetchall()
+        for digest, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            self._forget(digest)
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, digest):
+        row = self._connection.execute(
+            "SELECT size FROM images WHERE digest = ?", (digest,)
+            ).fetchone()
+        self._connection.execute(
+            "DELETE FROM images WHERE digest = ?", (digest,)
+            )
+        self._connection.execute(
+            "DELETE FROM urls WHERE digest = ?", (digest,)
+            )
+        if row:
+            self._size -= row[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _get_cache():
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ThumbnailCache(THUMBNAIL_DIR, THUMBNAIL_CACHE_MAX_BYTES)
+        return _cache
+
+
+def fetch_thumbnail(url):
+    """
+    Local copy of the cover image at url, downloaded the first time it is
+    asked for. None if it cannot be downloaded.
+    """
+    cache = _get_cache()
+    path = cache.get(url)
+    if path or _offline:
+        return path
+    try:
+        response = _get_session().get(url, timeout=HTTP_TIMEOUT)
+    except requests.RequestException:
+        return None
+    # An error page served with a 200 is not a cover
+    content_type = response.headers.get("Content-Type", "")
+    if response.status_code != 200 or not response.content \
+            or not content_type.startswith("image/"):
+        return None
+    return cache.put(url, response.content)
+
+
+def warm_thumbnails(candidates):
+    """Downloads the covers of candidates ahead of their preview."""
+    for candidate in candidates:
+        if candidate.get("image_url"):
+            fetch_thumbnail(candidate["image_url"])